@@ -34,11 +34,33 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 import subprocess
 import shutil
 from typing import AsyncIterable
+
+# Try to import optional dependencies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from monitoring.health_checks import health_monitor
+    MONITORING_AVAILABLE = True
+except ImportError:
+    MONITORING_AVAILABLE = False
 # Add this import at the top of the file
 from tools.rag_database import RAGDatabase
 from instructions.system_prompts import BASE_SYSTEM_PROMPT
 from instructions.tool_schemas import tools
 
+def jdumps(obj, *, indent=False) -> str:
+    """Serialize obj to a JSON string, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(',', ':'))
+
 # Initialize RAG database
 rag_db = None
 
@@ -493,6 +515,43 @@ async def text_to_speech(text):
         console.print("Fallback: Printing the text instead.", style="bold yellow")
         console.print(text)
 
+# Speech is a side channel: queue it so the chat loop never waits on playback
+_tts_queue: Optional[asyncio.Queue] = None
+_tts_worker_task: Optional[asyncio.Task] = None
+
+async def _tts_worker():
+    """Speak queued texts one at a time, preserving their order."""
+    while True:
+        text = await _tts_queue.get()
+        try:
+            await text_to_speech(text)
+        except Exception as e:
+            logging.error(f"Error in queued text-to-speech: {str(e)}")
+        finally:
+            _tts_queue.task_done()
+
+def start_tts_worker():
+    """Start the background text-to-speech worker if it is not running."""
+    global _tts_queue, _tts_worker_task
+    if _tts_worker_task is None or _tts_worker_task.done():
+        _tts_queue = asyncio.Queue()
+        _tts_worker_task = asyncio.create_task(_tts_worker())
+
+def schedule_text_to_speech(text):
+    """Queue text for speech without blocking the caller."""
+    start_tts_worker()
+    _tts_queue.put_nowait(text)
+
+async def shutdown_tts_worker():
+    """Let pending speech finish, then stop the worker."""
+    global _tts_worker_task
+    if _tts_worker_task is None:
+        return
+    await _tts_queue.join()
+    _tts_worker_task.cancel()
+    await asyncio.gather(_tts_worker_task, return_exceptions=True)
+    _tts_worker_task = None
+
 def initialize_speech_recognition():
     global recognizer, microphone
     recognizer = sr.Recognizer()
@@ -620,10 +679,15 @@ tavily = TavilyClient(api_key="")
 console = Console()
 
 # Token tracking variables
-main_model_tokens = {'input': 0, 'output': 0, 'cache_write': 0, 'cache_read': 0}
-tool_checker_tokens = {'input': 0, 'output': 0, 'cache_write': 0, 'cache_read': 0}
-code_editor_tokens = {'input': 0, 'output': 0, 'cache_write': 0, 'cache_read': 0}
-code_execution_tokens = {'input': 0, 'output': 0, 'cache_write': 0, 'cache_read': 0}
+TOKEN_KEYS = ('input', 'output', 'cache_write', 'cache_read')
+
+def _zero_tokens():
+    return dict.fromkeys(TOKEN_KEYS, 0)
+
+main_model_tokens = _zero_tokens()
+tool_checker_tokens = _zero_tokens()
+code_editor_tokens = _zero_tokens()
+code_execution_tokens = _zero_tokens()
 wordpress_analysis_tokens = {'input': 0, 'output': 0, 'cache_creation': 0, 'cache_read': 0} # Added missing variable
 USE_FUZZY_SEARCH = True
 
@@ -646,7 +710,7 @@ wordpress_editor_memory = []
 wordpress_editor_files = set()
 
 # Token tracking for WordPress editor
-wordpress_editor_tokens = {'input': 0, 'output': 0, 'cache_write': 0, 'cache_read': 0}
+wordpress_editor_tokens = _zero_tokens()
 
 # automode flag
 automode = False
@@ -4245,6 +4309,57 @@ async def handle_wp_db_tools(tool_name: str, tool_input: Dict[str, Any], db_mana
             "is_error": True
         }
 
+HISTORY_PRUNE_THRESHOLD = 0.8  # Fraction of MAX_CONTEXT_TOKENS that triggers pruning
+HISTORY_KEEP_RECENT = 6  # Most recent messages that are never pruned
+IMAGE_KEEP_RECENT = 4  # Images older than this many messages are replaced by a placeholder
+
+def _estimate_tokens(history):
+    """Rough token estimate (~4 characters per token) for a message list."""
+    return len(json.dumps(history, default=str)) // 4
+
+def _prune_history(history, max_tokens=MAX_CONTEXT_TOKENS):
+    """
+    Drop failed tool attempts and stale images from older turns once the history
+    approaches the context limit. The most recent messages are left untouched so
+    the older, stable prefix keeps benefiting from prompt caching.
+    """
+    if _estimate_tokens(history) <= max_tokens * HISTORY_PRUNE_THRESHOLD:
+        return history
+
+    cutoff = max(len(history) - HISTORY_KEEP_RECENT, 0)
+    image_cutoff = max(len(history) - IMAGE_KEEP_RECENT, 0)
+
+    # Collect tool_use ids whose results were errors so both halves of the pair go
+    failed_tool_ids = set()
+    for message in history[:cutoff]:
+        if isinstance(message['content'], list):
+            for block in message['content']:
+                if isinstance(block, dict) and block.get('type') == 'tool_result' and block.get('is_error'):
+                    failed_tool_ids.add(block.get('tool_use_id'))
+
+    pruned = []
+    for index, message in enumerate(history):
+        content = message['content']
+        if index < cutoff and isinstance(content, list):
+            content = [
+                block for block in content
+                if not (isinstance(block, dict) and (
+                    (block.get('type') == 'tool_use' and block.get('id') in failed_tool_ids) or
+                    (block.get('type') == 'tool_result' and block.get('tool_use_id') in failed_tool_ids)
+                ))
+            ]
+            if not content:
+                continue
+        if index < image_cutoff and isinstance(content, list):
+            content = [
+                {"type": "text", "text": "[image omitted from older turn]"}
+                if isinstance(block, dict) and block.get('type') == 'image' else block
+                for block in content
+            ]
+        pruned.append(message if content is message['content'] else {**message, 'content': content})
+
+    return pruned
+
 async def chat_with_mike(user_input, image_path=None, current_iteration=None, max_iterations=None):
     global conversation_history, automode, main_model_tokens, use_tts, tts_enabled
 
@@ -4319,6 +4434,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
     for attempt in range(max_retries):
         try:
             # MAINMODEL call with prompt caching
+            call_start = time.perf_counter()
             response = client.messages.create(
                 model=MAINMODEL,
                 max_tokens=8000,
@@ -4330,7 +4446,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
                     },
                     {
                         "type": "text",
-                        "text": json.dumps(tools),
+                        "text": jdumps(tools),
                         "cache_control": {"type": "ephemeral"}
                     }
                 ],
@@ -4339,6 +4455,8 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
                 tool_choice={"type": "auto"},
                 extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
             )
+            if MONITORING_AVAILABLE:
+                health_monitor.record_ai_latency(time.perf_counter() - call_start)
             # Update token usage for MAINMODEL
             main_model_tokens['input'] += response.usage.input_tokens
             main_model_tokens['output'] += response.usage.output_tokens
@@ -4375,7 +4493,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
     console.print(Panel(Markdown(assistant_response), title="Mike's Response", title_align="left", border_style="blue", expand=False))
     
     if tts_enabled and use_tts:
-        await text_to_speech(assistant_response)
+        schedule_text_to_speech(assistant_response)
 
     # Display files in context
     if file_contents:
@@ -4390,7 +4508,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
         tool_use_id = tool_use.id
 
         console.print(Panel(f"Tool Used: {tool_name}", style="green"))
-        console.print(Panel(f"Tool Input: {json.dumps(tool_input, indent=2)}", style="green"))
+        console.print(Panel(f"Tool Input: {jdumps(tool_input, indent=True)}", style="green"))
 
         # Always use execute_tool for all tools
         tool_result = await execute_tool(tool_name, tool_input)
@@ -4405,7 +4523,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
         # Prepare the tool_result_content for conversation history
         tool_result_content = {
             "type": "text",
-            "text": json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+            "text": jdumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
         }
 
         current_conversation.append({
@@ -4450,7 +4568,9 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
         messages = filtered_conversation_history + current_conversation
 
         try:
-            tool_response = client.messages.create(
+            # Stream the tool checker reply so text shows up as it is generated
+            tool_checker_chunks: List[str] = []
+            with client.messages.stream(
                 model=TOOLCHECKERMODEL,
                 max_tokens=8000,
                 system=update_system_prompt(current_iteration, max_iterations),
@@ -4458,18 +4578,20 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
                 messages=messages,
                 tools=tools,
                 tool_choice={"type": "auto"}
-            )
+            ) as stream:
+                for text in stream.text_stream:
+                    tool_checker_chunks.append(text)
+                    console.print(text, end="", markup=False, highlight=False)
+                tool_response = stream.get_final_message()
+            console.print()
             # Update token usage for tool checker
             tool_checker_tokens['input'] += tool_response.usage.input_tokens
             tool_checker_tokens['output'] += tool_response.usage.output_tokens
 
-            tool_checker_response = ""
-            for tool_content_block in tool_response.content:
-                if tool_content_block.type == "text":
-                    tool_checker_response += tool_content_block.text
+            tool_checker_response = "".join(tool_checker_chunks)
             console.print(Panel(Markdown(tool_checker_response), title="Mike's Response to Tool Result",  title_align="left", border_style="blue", expand=False))
             if use_tts:
-                await text_to_speech(tool_checker_response)
+                schedule_text_to_speech(tool_checker_response)
             assistant_response += "\n\n" + tool_checker_response
 
             # If the tool was edit_and_apply_multiple, let the AI decide whether to retry
@@ -4490,7 +4612,12 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
                     if retry_files:
                         retry_result, retry_console_output = await edit_and_apply_multiple(retry_files, tool_input['project_context'])
                         console.print(Panel(retry_console_output, title="Retry Result", style="cyan"))
-                        assistant_response += f"\n\nRetry result: {json.dumps(retry_result, indent=2)}"
+                        # Keep the full result on screen only; the model gets a compact summary
+                        retry_summary = {
+                            "retried": [result.get("path") for result in retry_result],
+                            "ok": sum(1 for result in retry_result if result.get("status") in ("success", "partial_success"))
+                        }
+                        assistant_response += f"\n\nRetry summary: {jdumps(retry_summary)}"
                     else:
                         console.print(Panel("No files to retry. Skipping retry.", style="yellow"))
                 else:
@@ -4504,7 +4631,7 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
     if assistant_response:
         current_conversation.append({"role": "assistant", "content": assistant_response})
 
-    conversation_history = messages + [{"role": "assistant", "content": assistant_response}]
+    conversation_history = _prune_history(messages + [{"role": "assistant", "content": assistant_response}])
 
     # Display token usage at the end
     display_token_usage()
@@ -4512,24 +4639,35 @@ async def chat_with_mike(user_input, image_path=None, current_iteration=None, ma
     return assistant_response, exit_continuation
 
 def reset_code_editor_memory():
-    global code_editor_memory
-    code_editor_memory = []
+    code_editor_memory.clear()
     console.print(Panel("Code editor memory has been reset.", title="Reset", style="bold green"))
 
 
 def reset_conversation():
-    global conversation_history, main_model_tokens, tool_checker_tokens, code_editor_tokens, code_execution_tokens, file_contents, code_editor_files
-    conversation_history = []
-    main_model_tokens = {'input': 0, 'output': 0}
-    tool_checker_tokens = {'input': 0, 'output': 0}
-    code_editor_tokens = {'input': 0, 'output': 0}
-    code_execution_tokens = {'input': 0, 'output': 0}
-    file_contents = {}
-    code_editor_files = set()
+    # Mutate in place so any caller holding a reference sees the reset state
+    conversation_history.clear()
+    for tokens in (main_model_tokens, tool_checker_tokens, code_editor_tokens, code_execution_tokens):
+        tokens.update(_zero_tokens())
+    file_contents.clear()
+    code_editor_files.clear()
     reset_code_editor_memory()
     console.print(Panel("Conversation history, token counts, file contents, code editor memory, and code editor files have been reset.", title="Reset", style="bold green"))
     display_token_usage()
 
+# Prices in $ per million tokens
+MODEL_COSTS = {
+    "Main Model": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": True},
+    "Tool Checker": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": False},
+    "Code Editor": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": True},
+    "Code Execution": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": False}
+}
+
+# Per-token rates, precomputed once at import
+COST_RATES = {
+    model: tuple(costs[key] / 1_000_000 for key in TOKEN_KEYS)
+    for model, costs in MODEL_COSTS.items()
+}
+
 def display_token_usage():
     from rich.table import Table
     from rich.panel import Panel
@@ -4545,14 +4683,6 @@ def display_token_usage():
     table.add_column(f"% of Context ({MAX_CONTEXT_TOKENS:,})", style="yellow")
     table.add_column("Cost ($)", style="red")
 
-    model_costs = {
-        "Main Model": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": True},
-        "Tool Checker": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": False},
-        "Code Editor": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": True},
-        "Code Execution": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30, "has_context": False}
-        
-    }
-
     total_input = 0
     total_output = 0
     total_cache_write = 0
@@ -4575,14 +4705,13 @@ def display_token_usage():
         total_cache_write += cache_write_tokens
         total_cache_read += cache_read_tokens
 
-        input_cost = (input_tokens / 1_000_000) * model_costs[model]["input"]
-        output_cost = (output_tokens / 1_000_000) * model_costs[model]["output"]
-        cache_write_cost = (cache_write_tokens / 1_000_000) * model_costs[model]["cache_write"]
-        cache_read_cost = (cache_read_tokens / 1_000_000) * model_costs[model]["cache_read"]
-        model_cost = input_cost + output_cost + cache_write_cost + cache_read_cost
+        input_rate, output_rate, cache_write_rate, cache_read_rate = COST_RATES[model]
+        model_cost = (input_tokens * input_rate + output_tokens * output_rate +
+                      cache_write_tokens * cache_write_rate + cache_read_tokens * cache_read_rate)
         total_cost += model_cost
 
-        if model_costs[model]["has_context"]:
+        has_context = MODEL_COSTS[model]["has_context"]
+        if has_context:
             total_context_tokens += total_tokens
             percentage = (total_tokens / MAX_CONTEXT_TOKENS) * 100
         else:
@@ -4595,7 +4724,7 @@ def display_token_usage():
             f"{cache_write_tokens:,}",
             f"{cache_read_tokens:,}",
             f"{total_tokens:,}",
-            f"{percentage:.2f}%" if model_costs[model]["has_context"] else "Doesn't save context",
+            f"{percentage:.2f}%" if has_context else "Doesn't save context",
             f"${model_cost:.3f}"
         )
 
@@ -4642,46 +4771,66 @@ async def test_voice_mode():
     console.print(Panel("Voice input test completed.", style="bold green"))
 
 import psutil
-import statistics
-from contextlib import contextmanager
+from collections import deque
+from contextlib import asynccontextmanager
 
 class PerformanceMonitor:
+    MAX_SAMPLES = 10_000
+    RSS_SAMPLE_EVERY = 16
+
     def __init__(self):
         self.metrics = {
-            'response_times': [],
-            'memory_usage': [],
+            'response_times': deque(maxlen=self.MAX_SAMPLES),
+            'memory_usage': deque(maxlen=self.MAX_SAMPLES),
             'database_queries': [],
             'cache_hit_rate': 0
         }
+        self._process = psutil.Process()
+        self._measure_count = 0
+        # Running totals keep report averages O(1) regardless of history length
+        self._resp_sum = 0.0
+        self._resp_count = 0
+        self._mem_sum = 0
+        self._mem_count = 0
     
-    @contextmanager
-    def measure_performance(self, operation: str):
-        """Context manager for performance measurement"""
+    @asynccontextmanager
+    async def measure_performance(self, operation: str):
+        """Async context manager for performance measurement"""
+        # RSS rarely moves per operation, so only sample it every few calls
+        sample_memory = self._measure_count % self.RSS_SAMPLE_EVERY == 0
+        self._measure_count += 1
+        start_memory = self._process.memory_info().rss if sample_memory else 0
         start_time = time.perf_counter()
-        start_memory = psutil.Process().memory_info().rss
         
         try:
             yield
         finally:
-            end_time = time.perf_counter()
-            end_memory = psutil.Process().memory_info().rss
+            duration = time.perf_counter() - start_time
+            timestamp = time.monotonic()
             
             self.metrics['response_times'].append({
                 'operation': operation,
-                'duration': end_time - start_time,
-                'timestamp': datetime.now()
+                'duration': duration,
+                'timestamp': timestamp
             })
+            self._resp_sum += duration
+            self._resp_count += 1
             
-            self.metrics['memory_usage'].append({
-                'operation': operation,
-                'memory_used': end_memory - start_memory,
-                'timestamp': datetime.now()
-            })
+            if sample_memory:
+                memory_used = self._process.memory_info().rss - start_memory
+                self.metrics['memory_usage'].append({
+                    'operation': operation,
+                    'memory_used': memory_used,
+                    'timestamp': timestamp
+                })
+                self._mem_sum += memory_used
+                self._mem_count += 1
     
     def get_performance_report(self) -> Dict[str, Any]:
         """Generate performance analysis report"""
         return {
-            'avg_response_time': statistics.mean([m['duration'] for m in self.metrics['response_times']]),
+            'avg_response_time': self._resp_sum / self._resp_count if self._resp_count else 0.0,
+            'avg_memory_used': self._mem_sum / self._mem_count if self._mem_count else 0.0,
             'memory_efficiency': self._calculate_memory_efficiency(),
             'bottlenecks': self._identify_bottlenecks(),
             'recommendations': self._generate_recommendations()
@@ -4699,6 +4848,18 @@ class PerformanceMonitor:
         # Placeholder
         return []
 
+import functools
+from collections import OrderedDict
+
+# Precompiled sanitizer patterns
+_SCRIPT_RE = re.compile(r'<script\b[^>]*>[\s\S]*?</script>', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=1024)
+def _normpath_cached(path: str) -> str:
+    return os.path.normpath(path)
+
+COMPILED_RULES_CACHE_SIZE = 128  # Distinct validation rule sets kept compiled
+
 class SecurityValidator:
     def __init__(self):
         self.sanitizers = {
@@ -4708,31 +4869,70 @@ class SecurityValidator:
             'file_path': self._sanitize_file_path,
             'url': self._sanitize_url
         }
+        self._type_checkers = {
+            'string': str.__instancecheck__,
+            'integer': int.__instancecheck__,
+        }
+        # LRU of frozen rules -> compiled rules, so equal rule dicts built per call share an entry
+        self._compiled_rules = OrderedDict()
     
+    def _compile_rules(self, validation_rules: Dict[str, Any]) -> Dict[str, Tuple]:
+        """Resolve type checker, sanitizer and validator for each field once per rule set"""
+        try:
+            key = tuple(sorted(
+                (field, tuple(sorted(rule.items(), key=lambda item: item[0])))
+                for field, rule in validation_rules.items()
+            ))
+            hash(key)
+        except TypeError:
+            # Unhashable rule values; compile without caching
+            key = None
+        if key is not None:
+            compiled = self._compiled_rules.get(key)
+            if compiled is not None:
+                self._compiled_rules.move_to_end(key)
+                return compiled
+        
+        compiled = {
+            field: (
+                self._type_checkers.get(rule.get('type')),
+                self.sanitizers.get(rule.get('sanitize', 'text'), self._sanitize_text),
+                rule.get('validator')
+            )
+            for field, rule in validation_rules.items()
+        }
+        if key is not None:
+            self._compiled_rules[key] = compiled
+            if len(self._compiled_rules) > COMPILED_RULES_CACHE_SIZE:
+                self._compiled_rules.popitem(last=False)
+        return compiled
+
     def validate_input(self, data: Any, validation_rules: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive input validation"""
+        compiled_rules = self._compile_rules(validation_rules)
         errors = []
         sanitized_data = {}
         
         for field, value in data.items():
-            if field in validation_rules:
-                rule = validation_rules[field]
-                
-                # Type validation
-                if not self._validate_type(value, rule.get('type')):
-                    errors.append(f"Invalid type for {field}")
-                    continue
-                
-                # Sanitization
-                sanitized_value = self._sanitize_value(value, rule.get('sanitize', 'text'))
-                
-                # Custom validation
-                if 'validator' in rule:
-                    if not rule['validator'](sanitized_value):
-                        errors.append(f"Validation failed for {field}")
-                        continue
-                
-                sanitized_data[field] = sanitized_value
+            compiled = compiled_rules.get(field)
+            if compiled is None:
+                continue
+            type_check, sanitizer, validator = compiled
+            
+            # Type validation
+            if type_check is not None and not type_check(value):
+                errors.append(f"Invalid type for {field}")
+                continue
+            
+            # Sanitization
+            sanitized_value = sanitizer(value)
+            
+            # Custom validation
+            if validator is not None and not validator(sanitized_value):
+                errors.append(f"Validation failed for {field}")
+                continue
+            
+            sanitized_data[field] = sanitized_value
         
         return {
             'valid': len(errors) == 0,
@@ -4745,26 +4945,28 @@ class SecurityValidator:
 
     def _sanitize_html(self, value):
         # Basic sanitization, consider a more robust library for production
-        return re.sub(r'<script.*?>.*?</script>', '', value, flags=re.IGNORECASE)
+        return _SCRIPT_RE.sub('', value)
 
     def _sanitize_sql(self, value):
         # This is a placeholder. Use prepared statements instead of sanitizing.
         return value
 
     def _sanitize_file_path(self, value):
-        return os.path.normpath(value)
+        # Fast path: absolute POSIX paths with no '//', '.' or '..' segments and
+        # no trailing slash are already what normpath would return
+        if (os.altsep is None and value.startswith('/') and '//' not in value
+                and '/.' not in value and not value.endswith('/')):
+            return value
+        return _normpath_cached(value)
 
     def _sanitize_url(self, value):
         # Basic URL sanitization
         return value
 
     def _validate_type(self, value, expected_type):
-        if expected_type == 'string':
-            return isinstance(value, str)
-        elif expected_type == 'integer':
-            return isinstance(value, int)
-        # Add more type validations as needed
-        return True
+        type_check = self._type_checkers.get(expected_type)
+        # Add more type validations to self._type_checkers as needed
+        return type_check is None or type_check(value)
 
     def _sanitize_value(self, value, sanitize_type):
         return self.sanitizers.get(sanitize_type, self._sanitize_text)(value)
@@ -4808,6 +5010,7 @@ async def main():
     
     # Initialize RAG database
     initialize_rag_database()
+    start_tts_worker()
      # Initialize PHP executor (if PHP is available)
     global php_executor, php_available
     try:
@@ -4946,6 +5149,7 @@ async def main():
         else:
             response, _ = await chat_with_mike(user_input)
 
+    await shutdown_tts_worker()
 
 
     # Add more tests for other functions as needed
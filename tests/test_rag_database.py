@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Make tools/ importable when pytest is run from anywhere
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from tools import rag_database
+
+class StubEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer"""
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _encode_one(self, text):
+        vector = np.zeros(384, dtype=np.float32)
+        for word in text.lower().split():
+            seed = int(hashlib.md5(word.encode()).hexdigest(), 16) % (2 ** 32)
+            vector += np.random.default_rng(seed).standard_normal(384).astype(np.float32)
+        return vector
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        StubEncoder.calls += 1
+        single = isinstance(texts, str)
+        matrix = np.stack([self._encode_one(text) for text in ([texts] if single else texts)])
+        if normalize_embeddings:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            matrix = matrix / norms
+        return matrix[0] if single else matrix
+
+@pytest.fixture
+def stub_encoder(monkeypatch):
+    monkeypatch.setattr(rag_database, "EMBEDDINGS_AVAILABLE", True)
+    monkeypatch.setattr(rag_database, "ONNX_AVAILABLE", False)
+    monkeypatch.setattr(rag_database, "np", np, raising=False)
+    monkeypatch.setattr(rag_database, "SentenceTransformer", StubEncoder, raising=False)
+
+@pytest.fixture
+def rag_db(tmp_path, stub_encoder):
+    db = rag_database.RAGDatabase(str(tmp_path / "kb.db"))
+    yield db
+    db.close()
+
+def _titles(result):
+    return [doc["title"] for doc in result["results"]["documents"]]
+
+def _stored_titles(database_path):
+    conn = sqlite3.connect(database_path)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT title FROM documents"))
+    finally:
+        conn.close()
+
+class TestRAGDatabase:
+    @pytest.mark.asyncio
+    async def test_add_search_delete_search(self, rag_db):
+        """Writes invalidate cached results and the in-memory index"""
+        await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+        added = await rag_db.add_document("Banana bread", "banana bread recipe", "guide")
+
+        result = await rag_db.search("banana bread", ["documents"], 5)
+        assert "Banana bread" in _titles(result)
+
+        await rag_db.delete_document(added["document_id"])
+        result = await rag_db.search("banana bread", ["documents"], 5)
+        assert "Banana bread" not in _titles(result)
+
+    @pytest.mark.asyncio
+    async def test_semantic_match_without_keyword_match(self, rag_db):
+        """A query with an unknown extra word only matches through the embedding index"""
+        await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+        await rag_db.add_document("Theme JSON", "theme json settings", "guide")
+
+        result = await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+        assert _titles(result) == ["Apple pie"]
+
+        result = await rag_db.search("zzz apple pie recipe", ["documents"], 5, use_semantic=False)
+        assert _titles(result) == []
+
+    @pytest.mark.asyncio
+    async def test_keyword_only_search_skips_encoding(self, rag_db):
+        """The query is not encoded when keyword matches fill every slot"""
+        await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+        calls = StubEncoder.calls
+
+        result = await rag_db.search("apple", ["documents"], 1)
+        assert _titles(result) == ["Apple pie"]
+        assert StubEncoder.calls == calls
+
+    @pytest.mark.asyncio
+    async def test_similar_query_keeps_its_keyword_matches(self, rag_db):
+        """A near-identical cached query is not reused when its keyword matches differ"""
+        # The two queries share an LSH bucket and have a cosine similarity above 0.98
+        shared = " ".join(f"word{i}" for i in range(60))
+        await rag_db.add_document("Red", f"{shared} red", "guide")
+        await rag_db.add_document("Blue", f"{shared} blue", "guide")
+
+        first = await rag_db.search(f"{shared} red", ["documents"], 5)
+        assert _titles(first)[0] == "Red"
+        second = await rag_db.search(f"{shared} blue", ["documents"], 5)
+        assert _titles(second)[0] == "Blue"
+
+    @pytest.mark.asyncio
+    async def test_bulk_commits_once_on_exit(self, rag_db):
+        with rag_db.bulk():
+            await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+            await rag_db.add_document("Banana bread", "banana bread recipe", "guide")
+            # Uncommitted rows are invisible to other connections
+            assert _stored_titles(rag_db.database_path) == []
+
+        assert _stored_titles(rag_db.database_path) == ["Apple pie", "Banana bread"]
+        result = await rag_db.search("recipe", ["documents"], 5)
+        assert sorted(_titles(result)) == ["Apple pie", "Banana bread"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_rollback(self, rag_db):
+        await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+        await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+
+        with pytest.raises(ValueError):
+            with rag_db.bulk():
+                await rag_db.add_document("Apple crumble", "apple pie recipe crumble", "guide")
+                raise ValueError("abort")
+
+        assert _stored_titles(rag_db.database_path) == ["Apple pie"]
+        result = await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+        assert _titles(result) == ["Apple pie"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_search_writes_no_sidecar(self, rag_db):
+        """An index built from uncommitted rows is never persisted; their version may roll back"""
+        await rag_db.add_document("Seed", "seed words", "guide")
+        with rag_db.bulk():
+            await rag_db.add_document("Ghost", "ghost haunted mansion", "guide")
+            # Searches read committed rows only, but the index load runs on the writer
+            await rag_db.search("zzz ghost haunted mansion", ["documents"], 5)
+            assert glob.glob(rag_db.database_path + ".*.npy") == []
+
+    @pytest.mark.asyncio
+    async def test_maintenance(self, rag_db):
+        """Rebuild, history clearing and optimize keep the database searchable"""
+        await rag_db.add_document("Apple pie", "apple pie recipe", "guide")
+        await rag_db.add_document("Theme JSON", "theme json settings", "guide")
+        await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+
+        rebuilt = await rag_db.rebuild_embeddings()
+        assert rebuilt["status"] == "success"
+        assert rebuilt["stats"]["documents_updated"] == 2
+
+        cleared = await rag_db.clear_search_history()
+        assert cleared["count"] == 1
+
+        with rag_db.bulk():
+            assert (await rag_db.optimize_database())["status"] == "error"
+        assert (await rag_db.optimize_database())["status"] == "success"
+
+        result = await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+        assert _titles(result) == ["Apple pie"]
+
+    @pytest.mark.asyncio
+    async def test_backup_restore_round_trip(self, rag_db, tmp_path):
+        await rag_db.add_document("Alpha", "alpha release notes", "guide")
+        backup = await rag_db.backup_database(str(tmp_path / "backups" / "alpha.db"))
+        assert backup["status"] == "success"
+
+        await rag_db.add_document("Charlie", "charlie release notes", "guide")
+        assert (await rag_db.search("charlie", ["documents"], 5))["total_results"] == 1
+
+        restored = await rag_db.restore_database(backup["backup_path"])
+        assert restored["status"] == "success"
+        assert _stored_titles(rag_db.database_path) == ["Alpha"]
+        assert _stored_titles(restored["previous_backup"]) == ["Alpha", "Charlie"]
+
+        assert _titles(await rag_db.search("charlie", ["documents"], 5)) == []
+        assert _titles(await rag_db.search("alpha", ["documents"], 5)) == ["Alpha"]
+
+    @pytest.mark.asyncio
+    async def test_restore_migrates_pickled_embeddings(self, rag_db, tmp_path, stub_encoder):
+        """Backups from before the float32 format are converted when restored"""
+        legacy_path = str(tmp_path / "legacy.db")
+        legacy = rag_database.RAGDatabase(legacy_path)
+        await legacy.add_document("Apple pie", "apple pie recipe", "guide")
+        legacy.close()
+
+        # Rewrite the row the way older versions stored it: a pickled, unnormalized array
+        conn = sqlite3.connect(legacy_path)
+        vector = StubEncoder()._encode_one("apple pie recipe")
+        conn.execute("UPDATE documents SET embedding = ?", (pickle.dumps(vector),))
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+
+        restored = await rag_db.restore_database(legacy_path)
+        assert restored["status"] == "success"
+        result = await rag_db.search("zzz apple pie recipe", ["documents"], 5)
+        assert result["status"] == "success"
+        assert _titles(result) == ["Apple pie"]
+
+    @pytest.mark.asyncio
+    async def test_recreated_database_ignores_old_sidecars(self, tmp_path, stub_encoder):
+        """Embedding sidecars of a deleted database are not loaded for a new one at the same path"""
+        database_path = str(tmp_path / "kb.db")
+        db = rag_database.RAGDatabase(database_path)
+        for text in ("apple pie recipe", "banana bread", "cherry tart"):
+            await db.add_document(text, text, "guide")
+        await db.search("zzz apple pie recipe", ["documents"], 5)
+        db.close()
+
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
+
+        db = rag_database.RAGDatabase(database_path)
+        try:
+            for text in ("wordpress hooks", "theme json", "plugin header"):
+                await db.add_document(text, text, "guide")
+            result = await db.search("zzz wordpress hooks", ["documents"], 5)
+            assert _titles(result) == ["wordpress hooks"]
+        finally:
+            db.close()
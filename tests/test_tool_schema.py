@@ -1,123 +1,198 @@
 import ast
-import inspect
+import collections
+import functools
+import hashlib
 import os
+import pathlib
+import pickle
 import sys
-from typing import Dict, Set, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
 
 # Ensure main.py can be imported
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
-    sys.path.append(SCRIPT_DIR)
-
-try:
-    from main import tools as defined_tools_list, execute_tool
-except ImportError as e:
-    print(f"Error importing from main.py: {e}")
-    print("Please ensure main.py is in the same directory as this script or in PYTHONPATH.")
-    sys.exit(1)
-
-class ExecuteToolVisitor(ast.NodeVisitor):
+    sys.path.insert(0, SCRIPT_DIR)
+
+# On-disk cache of the execute_tool analysis, keyed by a hash of its source.
+# Bump CACHE_VERSION whenever the visitor changes so stale results are ignored.
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache")
+CACHE_VERSION = "v5"
+
+def _match_tool_eq(test, _Cmp=ast.Compare, _Name=ast.Name, _Eq=ast.Eq, _Const=ast.Constant) -> str | None:
+    """Return X for a `tool_name == "X"` condition, else None."""
+    # Cheapest rejection first: most If conditions are not comparisons at all
+    if type(test) is not _Cmp:
+        return None
+    left = test.left
+    if type(left) is not _Name or left.id != 'tool_name' or type(test.ops[0]) is not _Eq:
+        return None
+    comparator = test.comparators[0]
+    if type(comparator) is _Const and type(comparator.value) is str:
+        return comparator.value
+    return None
+
+def _iter_interesting(root: ast.AST, _If=ast.If, _Subscript=ast.Subscript, _Call=ast.Call):
+    """
+    Iterative DFS over root yielding (node, tool_name) for tool-dispatch Ifs,
+    Subscripts and Calls. tool_name is the handling block the node sits in (None
+    outside any); for a dispatch If it is the tool that If handles. If conditions
+    are not descended into.
     """
-    AST visitor to find tool handling blocks in execute_tool and parameters accessed from tool_input.
+    _children = ast.iter_child_nodes
+    stack = [(root, None)]
+    while stack:
+        node, tool_name = stack.pop()
+        node_type = type(node)
+        if node_type is _If:
+            matched = _match_tool_eq(node.test)
+            if matched:
+                matched = sys.intern(matched)
+                yield node, matched
+                stack.extend((child, matched) for child in node.body)
+            else:
+                stack.extend((child, tool_name) for child in node.body)
+            # elif/else branches stay in the enclosing block's scope
+            stack.extend((child, tool_name) for child in node.orelse)
+            continue
+        if node_type is _Subscript or node_type is _Call:
+            yield node, tool_name
+        stack.extend((child, tool_name) for child in _children(node))
+
+def _extract_str_arg(node: Any) -> str | None:
+    if type(node) is ast.Constant and type(node.value) is str:
+        return node.value
+    return None
+
+# Subscript slices are plain expressions (no ast.Index wrapper) on the 3.10+ this module requires
+_extract_param_name_from_slice = _extract_str_arg
+
+# Handlers take (node, tool_name, params) and are looked up by type(node)
+
+def _do_if(node: ast.If, tool_name: str, params: Dict[str, Set[str]]):
+    params[tool_name]  # register tools that access no params
+
+def _do_subscript(node: ast.Subscript, tool_name: str | None, params: Dict[str, Set[str]], _Name=ast.Name):
+    # Nearly every node fails one of these two checks, so bail out as early as possible
+    if tool_name is None:
+        return
+    value = node.value
+    if type(value) is not _Name or value.id != 'tool_input':
+        return
+    param_name = _extract_param_name_from_slice(node.slice)
+    if param_name:
+        params[tool_name].add(param_name)
+
+def _do_call(node: ast.Call, tool_name: str | None, params: Dict[str, Set[str]],
+             _Attribute=ast.Attribute, _Name=ast.Name):
+    if tool_name is None:
+        return
+    # Check for tool_input.get('param_name')
+    func = node.func
+    if type(func) is not _Attribute or func.attr != 'get':
+        return
+    base = func.value
+    if type(base) is not _Name or base.id != 'tool_input' or not node.args:
+        return
+    param_name = _extract_str_arg(node.args[0])
+    if param_name:
+        params[tool_name].add(param_name)
+
+_HANDLERS = {ast.If: _do_if, ast.Subscript: _do_subscript, ast.Call: _do_call}
+
+class ExecuteToolVisitor:
+    """
+    Finds tool handling blocks in execute_tool and parameters accessed from tool_input.
+    Drives a single iterative walk instead of recursive NodeVisitor dispatch.
     """
     def __init__(self):
-        self.handled_tools_info: Dict[str, Dict[str, Set[str]]] = {}
-        self._current_tool_name_handling: str | None = None
-
-    def visit_If(self, node: ast.If):
-        original_tool_name_handling = self._current_tool_name_handling
-
-        tool_name_in_condition = None
-        if isinstance(node.test, ast.Compare) and \
-           isinstance(node.test.left, ast.Name) and node.test.left.id == 'tool_name' and \
-           isinstance(node.test.ops[0], ast.Eq):
-            comparator = node.test.comparators[0]
-            if isinstance(comparator, ast.Constant) and isinstance(comparator.value, str):
-                tool_name_in_condition = comparator.value
-            elif isinstance(comparator, ast.Str):  # Python < 3.8
-                tool_name_in_condition = comparator.s
-        
-        if tool_name_in_condition:
-            self._current_tool_name_handling = tool_name_in_condition
-            if tool_name_in_condition not in self.handled_tools_info:
-                self.handled_tools_info[tool_name_in_condition] = {"params_accessed": set()}
-            
-            for stmt_in_body in node.body:
-                self.visit(stmt_in_body)
-        else:
-            # Not a tool_name check, or a more complex condition. Visit body under original context.
-            for stmt_in_body in node.body:
-                self.visit(stmt_in_body)
-
-        # Process the 'orelse' part (elif or else)
-        for orelse_stmt in node.orelse:
-            self.visit(orelse_stmt)
-
-        self._current_tool_name_handling = original_tool_name_handling
-
-    def _extract_param_name_from_slice(self, sl_node: Any) -> str | None:
-        param_name = None
-        if isinstance(sl_node, ast.Constant) and isinstance(sl_node.value, str): # Py 3.9+ for direct constant slice
-            param_name = sl_node.value
-        elif isinstance(sl_node, ast.Index): # Common for Py < 3.9
-            if isinstance(sl_node.value, ast.Constant) and isinstance(sl_node.value.value, str): # Py 3.8
-                param_name = sl_node.value.value
-            elif isinstance(sl_node.value, ast.Str): # Py < 3.8
-                param_name = sl_node.value.s
-        return param_name
-
-    def visit_Subscript(self, node: ast.Subscript):
-        if self._current_tool_name_handling and \
-           isinstance(node.value, ast.Name) and node.value.id == 'tool_input':
-            param_name = self._extract_param_name_from_slice(node.slice)
-            if param_name and self._current_tool_name_handling in self.handled_tools_info: # Ensure key exists
-                self.handled_tools_info[self._current_tool_name_handling]["params_accessed"].add(param_name)
-        
-        self.generic_visit(node)
-
-    def visit_Call(self, node: ast.Call):
-        # Check for tool_input.get('param_name')
-        if self._current_tool_name_handling and \
-           isinstance(node.func, ast.Attribute) and \
-           isinstance(node.func.value, ast.Name) and node.func.value.id == 'tool_input' and \
-           node.func.attr == 'get' and len(node.args) >= 1:
-            
-            param_arg = node.args[0]
-            param_name = None
-            if isinstance(param_arg, ast.Constant) and isinstance(param_arg.value, str):
-                param_name = param_arg.value
-            elif isinstance(param_arg, ast.Str): # Python < 3.8
-                param_name = param_arg.s
-            
-            if param_name and self._current_tool_name_handling in self.handled_tools_info: # Ensure key exists
-                 self.handled_tools_info[self._current_tool_name_handling]["params_accessed"].add(param_name)
-        
-        self.generic_visit(node)
-
-def get_handled_tools_info(func) -> Dict[str, Dict[str, Set[str]]]:
-    source = inspect.getsource(func)
+        # Flat tool name -> accessed params
+        self.params: Dict[str, Set[str]] = collections.defaultdict(set)
+
+    def visit(self, func_node: ast.AST):
+        handlers = _HANDLERS
+        params = self.params
+        for node, tool_name in _iter_interesting(func_node):
+            handlers[type(node)](node, tool_name, params)
+
+@functools.lru_cache(maxsize=8)
+def _cached_analyze(src_hash: str, source: str, func_name: str) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+    """Analyze func_name in the module source once per process (and once per source on disk)."""
+    cache_path = os.path.join(CACHE_DIR, f"tool_schema_{src_hash}.pkl")
+
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    # Parse the module once and pick the function node out of it directly
     tree = ast.parse(source)
+    func_node = next(
+        (node for node in tree.body
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == func_name),
+        None
+    )
     
     visitor = ExecuteToolVisitor()
-    # The function itself is the first node in the parsed module's body
-    if tree.body and isinstance(tree.body[0], (ast.FunctionDef, ast.AsyncFunctionDef)):
-        visitor.visit(tree.body[0]) 
-    return visitor.handled_tools_info
+    if func_node is not None:
+        visitor.visit(func_node)
+    # Immutable so the memoized result can't be changed by callers
+    analysis = tuple((name, frozenset(params)) for name, params in visitor.params.items())
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump(analysis, f)
+    except OSError as e:
+        print(f"Warning: could not write analysis cache: {e}")
+    return analysis
+
+def get_handled_tools_info(func) -> Dict[str, FrozenSet[str]]:
+    # Read the defining module's file directly rather than going through inspect/linecache
+    source = pathlib.Path(sys.modules[func.__module__].__file__).read_text(encoding="utf-8")
+    src_hash = hashlib.blake2b(f"{CACHE_VERSION}:{func.__name__}:{source}".encode()).hexdigest()
+    return dict(_cached_analyze(src_hash, source, func.__name__))
+
+def _build_schemas(tools_list) -> Tuple[Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]], List[str]]:
+    """Map tool name -> (schema params, required schema params), plus warnings for malformed entries."""
+    defined_tool_schemas: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+    schema_warnings: List[str] = []
+    for tool_dict in tools_list:
+        if "name" in tool_dict and "input_schema" in tool_dict:
+            schema = tool_dict["input_schema"]
+            defined_tool_schemas[tool_dict["name"]] = (
+                frozenset(schema.get("properties", {})),
+                frozenset(schema.get("required", []))
+            )
+        else:
+            schema_warnings.append(f"Warning: Tool definition missing 'name' or 'input_schema': {tool_dict.get('name', 'Unknown')}")
+    return defined_tool_schemas, schema_warnings
 
 def run_tests():
-    print("Starting tool schema and execution analysis...\n")
+    # Imported here so collecting this module doesn't pay for loading main.py
+    try:
+        from main import tools as defined_tools_list, execute_tool
+    except ImportError as e:
+        print(f"Error importing from main.py: {e}")
+        print("Please ensure main.py is in the same directory as this script or in PYTHONPATH.")
+        sys.exit(1)
+
+    # Collect all output and write it once at the end
+    out: List[str] = []
+    out.append("Starting tool schema and execution analysis...\n")
     
-    handled_tools_info = get_handled_tools_info(execute_tool)
-    handled_tool_names_in_execute_tool = set(handled_tools_info.keys())
-    
-    defined_tool_schemas: Dict[str, Dict[str, Any]] = {}
-    for tool_dict in defined_tools_list:
-        if "name" in tool_dict and "input_schema" in tool_dict:
-            defined_tool_schemas[tool_dict["name"]] = tool_dict["input_schema"]
-        else:
-            print(f"Warning: Tool definition missing 'name' or 'input_schema': {tool_dict.get('name', 'Unknown')}")
+    # The execute_tool analysis and the schema table are independent; build them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        handled_future = executor.submit(get_handled_tools_info, execute_tool)
+        schemas_future = executor.submit(_build_schemas, defined_tools_list)
+        handled_tools_info = handled_future.result()
+        defined_tool_schemas, schema_warnings = schemas_future.result()
+
+    handled_tool_names_in_execute_tool = frozenset(handled_tools_info)
+    out.extend(schema_warnings)
 
-    defined_tool_names_from_list = set(defined_tool_schemas.keys())
+    defined_tool_names_from_list = frozenset(defined_tool_schemas)
 
     # --- Test Categories ---
     errors = []
@@ -136,52 +211,45 @@ def run_tests():
 
     # Test 3: Parameter consistency for tools that are both defined and handled
     for tool_name in defined_tool_names_from_list.intersection(handled_tool_names_in_execute_tool):
-        schema = defined_tool_schemas[tool_name]
-        schema_properties = schema.get("properties", {})
-        schema_params = set(schema_properties.keys())
-        required_schema_params = set(schema.get("required", []))
+        schema_params, required_schema_params = defined_tool_schemas[tool_name]
         
-        accessed_params = handled_tools_info[tool_name]["params_accessed"]
+        accessed_params = handled_tools_info[tool_name]
 
-        all_params_match = True
+        # Fast path: everything accessed is declared and everything required is accessed
+        if accessed_params <= schema_params and required_schema_params <= accessed_params:
+            out.append(f"[SUCCESS] Tool '{tool_name}': Definition and handling appear consistent.")
+            success_count += 1
+            continue
 
         # Accessed params not in schema
-        for acc_param in accessed_params:
-            if acc_param not in schema_params:
-                errors.append(f"[ERROR] Tool '{tool_name}': Parameter '{acc_param}' accessed in execute_tool but NOT defined in its schema.")
-                all_params_match = False
+        for acc_param in accessed_params - schema_params:
+            errors.append(f"[ERROR] Tool '{tool_name}': Parameter '{acc_param}' accessed in execute_tool but NOT defined in its schema.")
         
         # Required schema params not accessed
-        for req_param in required_schema_params:
-            if req_param not in accessed_params:
-                # This could be a warning if tool_input is passed directly to a sub-handler
-                warnings.append(f"[WARNING] Tool '{tool_name}': REQUIRED schema parameter '{req_param}' is NOT directly accessed from tool_input in execute_tool. (Verify handler if tool_input is passed directly).")
-                all_params_match = False # Treat as potential issue
+        for req_param in required_schema_params - accessed_params:
+            # This could be a warning if tool_input is passed directly to a sub-handler
+            warnings.append(f"[WARNING] Tool '{tool_name}': REQUIRED schema parameter '{req_param}' is NOT directly accessed from tool_input in execute_tool. (Verify handler if tool_input is passed directly).")
 
         # Optional schema params not accessed (less critical, could be informational)
         # for schema_param in schema_params - required_schema_params:
         #     if schema_param not in accessed_params:
-        #         print(f"[INFO] Tool '{tool_name}': Optional schema parameter '{schema_param}' not directly accessed.")
+        #         out.append(f"[INFO] Tool '{tool_name}': Optional schema parameter '{schema_param}' not directly accessed.")
 
-        if all_params_match and not any(e.startswith(f"[ERROR] Tool '{tool_name}'") for e in errors):
-             print(f"[SUCCESS] Tool '{tool_name}': Definition and handling appear consistent.")
-             success_count +=1
 
-
-    print("\n--- Test Summary ---")
+    out.append("\n--- Test Summary ---")
     if not errors and not warnings:
-        print("All tests passed! Tool definitions and execute_tool handling are consistent.")
+        out.append("All tests passed! Tool definitions and execute_tool handling are consistent.")
     else:
-        for e in errors:
-            print(e)
-        for w in warnings:
-            print(w)
+        out.extend(errors)
+        out.extend(warnings)
     
-    print(f"\nTotal tools defined in list: {len(defined_tool_names_from_list)}")
-    print(f"Total tools found handled in execute_tool: {len(handled_tool_names_in_execute_tool)}")
-    print(f"Tools with consistent definition & handling: {success_count}")
-    print(f"Errors found: {len(errors)}")
-    print(f"Warnings found: {len(warnings)}")
+    out.append(f"\nTotal tools defined in list: {len(defined_tool_names_from_list)}")
+    out.append(f"Total tools found handled in execute_tool: {len(handled_tool_names_in_execute_tool)}")
+    out.append(f"Tools with consistent definition & handling: {success_count}")
+    out.append(f"Errors found: {len(errors)}")
+    out.append(f"Warnings found: {len(warnings)}")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     run_tests()
\ No newline at end of file
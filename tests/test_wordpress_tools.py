@@ -2,29 +2,57 @@ import pytest
 import asyncio
 from unittest.mock import Mock, patch, AsyncMock
 import os
+import pathlib
+import re
+from collections import OrderedDict
 
 # Mock the WordPressDBManager and SecurityValidator for testing
+_SQLI = re.compile(r"\b(?:DROP|TRUNCATE|DELETE|ALTER|INSERT|UPDATE|EXEC|UNION)\b", re.IGNORECASE)
+
 class WordPressDBManager:
     async def execute_query(self, query, params=None):
         return [{"id": 1, "title": "Test"}]
 
+_COMPILED_CACHE_SIZE = 128
+
 class SecurityValidator:
-    def validate_input(self, data, rules):
-        if "sql" in rules.get("query", {}).get("sanitize", ""):
-            if "DROP" in data.get("query", ""):
+    def __init__(self):
+        # LRU of frozen rules -> compiled check, so equal rule dicts built per call share an entry
+        self._compiled = OrderedDict()
+
+    def _compile(self, rules):
+        key = tuple(sorted((field, tuple(sorted(rule.items()))) for field, rule in rules.items()))
+        check = self._compiled.get(key)
+        if check is not None:
+            self._compiled.move_to_end(key)
+            return check
+
+        check_sql = "sql" in rules.get("query", {}).get("sanitize", "")
+
+        def check(data):
+            if check_sql and _SQLI.search(data.get("query", "")):
                 return {"valid": False, "errors": ["Potential SQL injection detected"]}
-        return {"valid": True, "errors": [], "data": data}
+            return {"valid": True, "errors": [], "data": data}
+
+        self._compiled[key] = check
+        if len(self._compiled) > _COMPILED_CACHE_SIZE:
+            self._compiled.popitem(last=False)
+        return check
+
+    def validate_input(self, data, rules):
+        return self._compile(rules)(data)
 
 # Mock the main functions that will be tested
-def create_wordpress_theme(theme_name):
-    theme_dir = f"wp-content/themes/{theme_name}"
-    os.makedirs(theme_dir, exist_ok=True)
-    with open(f"{theme_dir}/style.css", "w") as f:
-        f.write(f"/*\nTheme Name: {theme_name}\n*/")
-    with open(f"{theme_dir}/index.php", "w") as f:
-        f.write("<?php // index.php")
-    with open(f"{theme_dir}/functions.php", "w") as f:
-        f.write("<?php // functions.php")
+def create_wordpress_theme(theme_name, root="wp-content/themes"):
+    theme_dir = pathlib.Path(root) / theme_name
+    theme_dir.mkdir(parents=True, exist_ok=True)
+    files = (
+        ("style.css", f"/*\nTheme Name: {theme_name}\n*/"),
+        ("index.php", "<?php // index.php"),
+        ("functions.php", "<?php // functions.php"),
+    )
+    for file_name, contents in files:
+        (theme_dir / file_name).write_text(contents)
     return f"WordPress theme '{theme_name}' structure created successfully."
 
 class TestWordPressTools:
@@ -33,13 +61,13 @@ class TestWordPressTools:
         return Mock(spec=WordPressDBManager)
     
     @pytest.mark.asyncio
-    async def test_create_wordpress_theme(self):
+    async def test_create_wordpress_theme(self, tmp_path):
         """Test WordPress theme creation"""
-        result = create_wordpress_theme("test-theme")
+        result = create_wordpress_theme("test-theme", root=str(tmp_path))
         assert "successfully" in result
         
         # Verify theme files were created
-        theme_path = "wp-content/themes/test-theme"
+        theme_path = tmp_path / "test-theme"
         assert os.path.exists(f"{theme_path}/style.css")
         assert os.path.exists(f"{theme_path}/index.php")
         assert os.path.exists(f"{theme_path}/functions.php")
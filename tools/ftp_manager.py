@@ -1,9 +1,20 @@
 import os
+import re
 import ftplib
+import socket
 import asyncio
+import functools
+import itertools
+import json
+import time
 import logging
 import datetime
-from typing import Dict, List, Optional, Any, Tuple
+import posixpath
+import shlex
+import tarfile
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
@@ -19,16 +30,737 @@ from prompt_toolkit.styles import Style
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 console = Console()
 
+# Socket buffer size for FTP data connections
+DATA_SOCKET_BUFFER = 4 * 1024 * 1024
+
+# Block size for storbinary/retrbinary
+TRANSFER_BLOCK_SIZE = 256 * 1024
+
+# Uploads at least this large are sent with sendfile(2) where available
+SENDFILE_MIN_BYTES = 1024 * 1024
+SENDFILE_CHUNK = 4 * 1024 * 1024
+
+# Transfers smaller than this finish too quickly to be worth a progress bar
+PROGRESS_MIN_BYTES = 1_000_000
+
+# Facts requested from MLSD listings with OPTS MLST
+MLSD_FACTS = "type;size;modify;"
+
+# Seconds a directory listing is served from cache
+LISTING_CACHE_TTL = 30
+
+# Name of the temporary archive used by archive uploads
+UPLOAD_ARCHIVE_NAME = ".wpe-upload.tar.gz"
+
+# Archive uploads pack files below this size; larger ones are still sent individually
+ARCHIVE_MAX_FILE_BYTES = 32 * 1024
+
+# Sidecar file recording finished downloads so an interrupted backup can resume
+BACKUP_STATE_FILE = ".resume.json"
+BACKUP_STATE_INTERVAL = 100
+
+# Reconnect attempts (with exponential backoff from RECONNECT_BACKOFF seconds)
+# after the server drops a control connection
+RECONNECT_ATTEMPTS = 3
+RECONNECT_BACKOFF = 0.5
+
+# Seconds between NOOPs on the idle primary connection while pooled transfers run
+KEEPALIVE_INTERVAL = 20
+
+# Extra connections opened per logical connection for concurrent transfers.
+# Kept modest because shared WordPress hosts often cap connections per IP.
+DEFAULT_POOL_SIZE = 4
+
+class FastFTP(ftplib.FTP):
+    """
+    ftplib.FTP with Nagle disabled on the control and data sockets.
+    
+    Passive mode needs no capability caching: ftplib sends PASV on IPv4
+    and EPSV on IPv6 without probing, so each transfer costs one command.
+    
+    ftplib sends TYPE before every transfer (TYPE I for storbinary and
+    retrbinary, TYPE A for LIST/MLSD). The last TYPE the server accepted is
+    remembered and repeats are answered locally, saving a round trip per file.
+    """
+    
+    _type_cmd = None
+    _type_resp = None
+    
+    def connect(self, *args, **kwargs):
+        self._type_cmd = None
+        welcome = super().connect(*args, **kwargs)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # TCP keepalives stop NAT/firewall state for the quiet control socket
+        # expiring during a long transfer
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
+        return welcome
+    
+    def login(self, *args, **kwargs):
+        # A new session starts back in ASCII mode
+        self._type_cmd = None
+        resp = super().login(*args, **kwargs)
+        # Choose the MLSD facts once per session; mlsd(facts=...) would resend OPTS on every listing
+        try:
+            self.sendcmd(f'OPTS MLST {MLSD_FACTS}')
+        except ftplib.error_perm:
+            # Servers without OPTS MLST send their default facts, which include these
+            pass
+        return resp
+    
+    def _send_type(self, cmd, send):
+        if cmd == self._type_cmd:
+            return self._type_resp
+        self._type_cmd = None
+        resp = send(cmd)
+        self._type_cmd, self._type_resp = cmd, resp
+        return resp
+    
+    def sendcmd(self, cmd):
+        if cmd.startswith('TYPE '):
+            return self._send_type(cmd, super().sendcmd)
+        return super().sendcmd(cmd)
+    
+    def voidcmd(self, cmd):
+        if cmd.startswith('TYPE '):
+            return self._send_type(cmd, super().voidcmd)
+        return super().voidcmd(cmd)
+    
+    def ntransfercmd(self, cmd, rest=None):
+        conn, size = super().ntransfercmd(cmd, rest)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, DATA_SOCKET_BUFFER)
+            conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, DATA_SOCKET_BUFFER)
+        except OSError:
+            # Some platforms cap or reject large buffers; keep the defaults
+            pass
+        return conn, size
+
+# One line of Unix-style LIST output: type, size, date and name (which may contain spaces)
+_LIST_RE = re.compile(r'^([-dlbcps])\S*\s+\S+\s+\S+\s+\S+\s+(\d+)\s+(\S+\s+\S+\s+\S+)\s(.+)$')
+
+# Quoted pathname in a PWD/CWD reply; embedded quotes are doubled (RFC 959)
+_QUOTED_PATH_RE = re.compile(r'"((?:[^"]|"")*)"')
+
+def _change_dir(ftp: ftplib.FTP, path: str, current_dir: str) -> str:
+    """
+    CWD to path and return the new working directory without a PWD.
+    
+    Most servers echo the new directory in the 250 reply; otherwise it is
+    derived from current_dir. Blocking; run it through FTPManager._call.
+    """
+    resp = ftp.sendcmd(f'CWD {path}')
+    match = _QUOTED_PATH_RE.search(resp)
+    if match:
+        return match.group(1).replace('""', '"')
+    return posixpath.normpath(posixpath.join(current_dir, path))
+
+def _format_mlsd_time(value: str) -> str:
+    """Format an MLSD modify fact (YYYYMMDDHHMMSS) as YYYY-MM-DD HH:MM."""
+    if len(value) < 12:
+        return value
+    return f"{value[0:4]}-{value[4:6]}-{value[6:8]} {value[8:10]}:{value[10:12]}"
+
+def _list_dir(ftp: ftplib.FTP, path: str = "") -> List[Dict[str, Any]]:
+    """
+    List a remote directory, skipping . and ..
+    
+    Uses MLSD where the server supports it and falls back to parsing LIST.
+    Blocking; run it through FTPManager._call.
+    
+    Returns:
+        List of {"name", "is_dir", "size", "date"} dicts
+    """
+    entries = []
+    
+    if getattr(ftp, "mlsd_supported", True):
+        try:
+            # Facts were selected with OPTS MLST at login
+            for name, facts in ftp.mlsd(path):
+                kind = facts.get("type", "")
+                if kind in ("cdir", "pdir") or name in (".", ".."):
+                    continue
+                entries.append({
+                    "name": name,
+                    "is_dir": kind == "dir",
+                    "size": int(facts.get("size") or 0),
+                    "date": _format_mlsd_time(facts.get("modify", ""))
+                })
+            return entries
+        except ftplib.error_perm as e:
+            # 500/502 mean MLSD isn't implemented; anything else (501 for a bad path, 550) is a real error
+            if not str(e).startswith(("500", "502")):
+                raise
+            ftp.mlsd_supported = False
+            entries.clear()
+    
+    def process_line(line, match=_LIST_RE.match):
+        m = match(line)
+        if not m:
+            return
+        kind, size, date, name = m.groups()
+        if kind == 'l':
+            # Symlinks are listed as "name -> target"
+            name = name.partition(' -> ')[0]
+        if name not in ('.', '..'):
+            entries.append({
+                "name": name,
+                "is_dir": kind == 'd',
+                "size": int(size),
+                "date": date
+            })
+    
+    ftp.retrlines(f'LIST {path}' if path else 'LIST', process_line)
+    return entries
+
+def _path_exists(ftp: ftplib.FTP, path: str) -> bool:
+    """
+    Check whether a remote file or directory exists in a single command.
+    
+    Uses MLST, falling back to SIZE (files) and CWD (directories) on servers
+    without it. CWD may move the working directory, so only call this with
+    absolute paths on a pooled connection. Blocking; run it in a thread.
+    """
+    if getattr(ftp, "mlst_supported", True):
+        try:
+            ftp.sendcmd(f'MLST {path}')
+            return True
+        except ftplib.error_perm as e:
+            if str(e).startswith("550"):
+                return False
+            if not str(e).startswith(("500", "501", "502")):
+                raise
+            ftp.mlst_supported = False
+    
+    # Servers commonly refuse SIZE in ASCII mode
+    ftp.voidcmd('TYPE I')
+    for probe in (ftp.size, ftp.cwd):
+        try:
+            probe(path)
+            return True
+        except ftplib.error_perm as e:
+            if not str(e).startswith("550"):
+                raise
+    return False
+
+def _remove_tree(ftp: ftplib.FTP, path: str) -> None:
+    """
+    Delete a remote directory and everything below it.
+    
+    Walks the tree depth-first with an explicit stack using absolute paths,
+    so no CWD is issued and any pooled connection can run it. Blocking;
+    run it in a worker thread.
+    """
+    # (path, children_removed) - a directory is removed on its second visit
+    stack = [(path, False)]
+    while stack:
+        current, children_removed = stack.pop()
+        if children_removed:
+            ftp.rmd(current)
+            continue
+        
+        stack.append((current, True))
+        for entry in _list_dir(ftp, current):
+            child = f"{current}/{entry['name']}"
+            if entry["is_dir"]:
+                stack.append((child, False))
+            else:
+                ftp.delete(child)
+
+def _store_file(ftp: ftplib.FTP, local_path: str, remote_path: str,
+                progress: Optional[Progress] = None, task=None,
+                blocksize: int = TRANSFER_BLOCK_SIZE) -> None:
+    """
+    Upload a local file with STOR, advancing an optional progress task.
+    
+    Opening and reading the local file happen here too, so running this in
+    a worker thread keeps all disk I/O off the event loop. Large files go
+    straight from the page cache to the data socket with sendfile(2).
+    """
+    # Unbuffered: storbinary reads whole blocks, so a BufferedReader would only add a copy
+    with open(local_path, 'rb', buffering=0) as file:
+        file_size = os.fstat(file.fileno()).st_size
+        if file_size >= SENDFILE_MIN_BYTES and hasattr(os, "sendfile"):
+            ftp.voidcmd('TYPE I')
+            with ftp.transfercmd(f'STOR {remote_path}') as conn:
+                offset = 0
+                while offset < file_size:
+                    # socket.sendfile waits on the socket timeout ftplib sets
+                    sent = conn.sendfile(file, offset, min(SENDFILE_CHUNK, file_size - offset))
+                    if not sent:
+                        break
+                    offset += sent
+                    if progress is not None:
+                        progress.update(task, advance=sent)
+            ftp.voidresp()
+            return
+        
+        if progress is None:
+            ftp.storbinary(f'STOR {remote_path}', file, blocksize)
+            return
+        
+        def callback(data, update=progress.update):
+            update(task, advance=len(data))
+        
+        ftp.storbinary(f'STOR {remote_path}', file, blocksize, callback)
+
+def _retrieve_file(ftp: ftplib.FTP, remote_path: str, local_path: str,
+                   progress: Optional[Progress] = None, task=None,
+                   blocksize: int = TRANSFER_BLOCK_SIZE, offset: int = 0) -> None:
+    """
+    Download a remote file with RETR, advancing an optional progress task.
+    
+    Opening and writing the local file happen here too, so running this in
+    a worker thread keeps all disk I/O off the event loop. A non-zero offset
+    sends REST and appends to the partial local file.
+    """
+    rest = offset or None
+    # Blocks are already large, so write them straight through without a BufferedWriter
+    with open(local_path, 'ab' if offset else 'wb', buffering=0) as file:
+        if progress is None:
+            ftp.retrbinary(f'RETR {remote_path}', file.write, blocksize, rest)
+            return
+        
+        def write_chunk(data, write=file.write, update=progress.update):
+            write(data)
+            update(task, advance=len(data))
+        
+        ftp.retrbinary(f'RETR {remote_path}', write_chunk, blocksize, rest)
+
+def _rewind_download(local_path: str, offset: int, progress: Optional[Progress] = None, task=None) -> None:
+    """Truncate a partly retrieved file back to offset before the download is retried."""
+    try:
+        written = os.path.getsize(local_path) - offset
+    except FileNotFoundError:
+        return
+    if written > 0:
+        os.truncate(local_path, offset)
+        if progress is not None:
+            progress.update(task, advance=-written)
+
+def _find_resumable_backup(backup_dir: str, remote_root: str) -> Tuple[Optional[str], set]:
+    """
+    Find the newest unfinished backup of remote_root in backup_dir.
+    
+    Returns:
+        The backup folder (or None) and the relative paths it already finished
+    """
+    for name in sorted(os.listdir(backup_dir), reverse=True):
+        if not name.startswith("wp_backup_"):
+            continue
+        backup_path = os.path.join(backup_dir, name)
+        try:
+            with open(os.path.join(backup_path, BACKUP_STATE_FILE)) as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if state.get("remote_root") == remote_root:
+            return backup_path, set(state.get("completed", []))
+    return None, set()
+
+def _save_backup_state(backup_path: str, remote_root: str, completed: set) -> None:
+    """Atomically write the resume sidecar for a backup in progress."""
+    state_path = os.path.join(backup_path, BACKUP_STATE_FILE)
+    with open(state_path + ".tmp", 'w') as file:
+        json.dump({"remote_root": remote_root, "completed": sorted(completed)}, file)
+    os.replace(state_path + ".tmp", state_path)
+
+def _make_dirs(ftp: ftplib.FTP, path: str, current_dir: str) -> List[str]:
+    """
+    Create a remote directory and any missing parents.
+    
+    Probes with CWD from the leaf upward so an existing tree costs one
+    round trip, then issues MKD only for the missing tail. The working
+    directory is restored to current_dir if it was changed.
+    Blocking; run it through FTPManager._call.
+    
+    Returns:
+        Paths of the directories that were created, parents first
+    """
+    probe = path.rstrip('/') or '/'
+    missing = []
+    moved = False
+    
+    try:
+        while probe:
+            try:
+                ftp.cwd(probe)
+                moved = True
+                break
+            except ftplib.error_perm:
+                probe, name = posixpath.split(probe)
+                if not name:
+                    raise
+                missing.append(name)
+        
+        # MKD relative to the deepest existing directory we are now in
+        created = []
+        rel = ""
+        for name in reversed(missing):
+            rel = posixpath.join(rel, name)
+            ftp.mkd(rel)
+            created.append(posixpath.join(probe, rel))
+        return created
+    finally:
+        if moved:
+            ftp.cwd(current_dir)
+
+def _is_dir(ftp: ftplib.FTP, path: str) -> bool:
+    """
+    Check whether a remote directory exists by changing into it.
+    
+    The working directory is restored afterwards. Blocking; run it in a worker thread.
+    """
+    current_dir = ftp.pwd()
+    try:
+        ftp.cwd(path)
+    except ftplib.error_perm:
+        return False
+    ftp.cwd(current_dir)
+    return True
+
+def _scan_local_tree(local_root: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Enumerate a local tree once with os.scandir.
+    
+    Returns:
+        Relative directories (parents first) and (local_file, relative_file) pairs,
+        with relative paths using '/' separators
+    """
+    dirs = []
+    files = []
+    stack = [(local_root, "")]
+    while stack:
+        local_dir, rel_dir = stack.pop()
+        with os.scandir(local_dir) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                # Like os.walk, list symlinked directories but don't descend into them
+                if entry.is_dir():
+                    dirs.append(rel_path)
+                    if not entry.is_symlink():
+                        stack.append((entry.path, rel_path))
+                else:
+                    files.append((entry.path, rel_path))
+    return dirs, files
+
+def _build_archive(files: List[Tuple[str, str]]):
+    """
+    Pack (local_file, relative_file) pairs into a gzipped tar in a temporary file.
+    
+    Blocking; run it in a worker thread.
+    
+    Returns:
+        The temporary file, rewound to the start
+    """
+    archive = tempfile.TemporaryFile()
+    try:
+        with tarfile.open(fileobj=archive, mode="w:gz", dereference=True) as tar:
+            for local_file, rel_file in files:
+                tar.add(local_file, arcname=rel_file, recursive=False)
+        archive.seek(0)
+    except BaseException:
+        archive.close()
+        raise
+    return archive
+
+def _split_by_size(files: List[Tuple[str, str]], limit: int) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    Partition (local_file, relative_file) pairs into files smaller than limit and the rest.
+    
+    Blocking; run it in a worker thread.
+    """
+    small = []
+    large = []
+    for entry in files:
+        (small if os.path.getsize(entry[0]) < limit else large).append(entry)
+    return small, large
+
+def _collect_tree(local_root: str, remote_root: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Walk a local tree and map it onto remote_root.
+    
+    Returns:
+        Remote directories sorted parents first, and (local_file, remote_file) pairs
+    """
+    rel_dirs, rel_files = _scan_local_tree(local_root)
+    dirs = [remote_root] + [f"{remote_root}/{rel_dir}" for rel_dir in rel_dirs]
+    files = [(local_file, f"{remote_root}/{rel_file}") for local_file, rel_file in rel_files]
+    return sorted(dirs, key=lambda path: path.count('/')), files
+
+def _requires_connection(method):
+    """
+    Resolve the connection_name keyword (default: the current connection)
+    and pass the connection dict to the method as conn, or return an error.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, connection_name: Optional[str] = None, **kwargs):
+        conn = self.connections.get(connection_name or self.current_connection)
+        if conn is None:
+            return {
+                "status": "error",
+                "message": "No active FTP connection"
+            }
+        return await method(self, conn, *args, **kwargs)
+    return wrapper
+
 class FTPManager:
     """FTP Manager for WordPress installations and file management."""
     
-    def __init__(self):
+    # Interactive mode command completions and prompt style, built once
+    _COMMANDS = (
+        "connect", "disconnect", "list", "upload", "download", "mkdir", 
+        "rmdir", "delete", "rename", "cd", "pwd", "connections", "switch",
+        "upload-theme", "upload-plugin", "backup", "help", "exit"
+    )
+    _COMPLETER = WordCompleter(list(_COMMANDS))
+    _STYLE = Style.from_dict({
+        'prompt': 'bold cyan',
+    })
+    
+    def __init__(self, blocksize: int = TRANSFER_BLOCK_SIZE):
         self.connections = {}
+        # Block size for storbinary/retrbinary on this manager's transfers
+        self.blocksize = blocksize
         self.current_connection = None
         self.logger = logging.getLogger("FTPManager")
+        # (connection_name, directory) -> (timestamp, (directories, files))
+        self._listing_cache: Dict[Tuple[str, str], Tuple[float, Tuple[List, List]]] = {}
+    
+    async def _call(self, conn: Dict[str, Any], fn, *args,
+                    retry: Union[bool, Callable[[], None]] = True, **kwargs):
+        """
+        Run a blocking ftplib call in a worker thread, one command at a time per connection.
+        
+        Every FTP command goes through here (or through a pooled connection in a
+        thread), so the event loop never blocks on the network. ftplib is kept
+        over an asyncio client because FastFTP's socket tuning, the sendfile
+        upload path and the MLST/SITE commands are all built on it.
+        
+        If the server has dropped the connection, it is re-established and the
+        call retried once. Pass retry=False for commands that are unsafe to
+        repeat, or a blocking callable that restores the transfer's local side
+        (rewinding a source file, truncating a partial download) before the retry.
+        """
+        async with conn["lock"]:
+            try:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            except (ConnectionError, EOFError, ftplib.error_temp) as e:
+                # 421 is the server closing the session; other 4xx replies are real errors
+                if isinstance(e, ftplib.error_temp) and not str(e).startswith("421"):
+                    raise
+                self.logger.warning(f"Connection {conn['name']} dropped ({e}); reconnecting")
+                await self._reconnect(conn)
+                if not retry:
+                    raise
+                if callable(retry):
+                    await asyncio.to_thread(retry)
+                return await asyncio.to_thread(fn, *args, **kwargs)
+    
+    async def _reconnect(self, conn: Dict[str, Any]) -> None:
+        """
+        Re-open the primary control connection in place with exponential backoff.
+        
+        The same FastFTP object is reconnected, so bound methods and helpers
+        already holding it keep working. The caller must hold conn["lock"].
+        """
+        ftp = conn["ftp"]
+        for attempt in range(RECONNECT_ATTEMPTS):
+            await asyncio.sleep(RECONNECT_BACKOFF * 2 ** attempt)
+            try:
+                await asyncio.to_thread(ftp.close)
+                await asyncio.to_thread(ftp.connect, conn["host"], conn["port"], timeout=10)
+                await asyncio.to_thread(ftp.login, conn["username"], conn["password"])
+                await asyncio.to_thread(ftp.cwd, conn["current_dir"])
+                self.logger.info(f"Reconnected {conn['name']} to {conn['host']}")
+                return
+            except ftplib.all_errors as e:
+                if attempt == RECONNECT_ATTEMPTS - 1:
+                    raise
+                self.logger.warning(f"Reconnect attempt {attempt + 1} to {conn['host']} failed: {e}")
+    
+    async def _open_ftp(self, host: str, port: int, username: str, password: str) -> FastFTP:
+        """Open and log in a new FTP control connection."""
+        ftp = FastFTP()
+        await asyncio.to_thread(ftp.connect, host, port, timeout=10) # Add timeout for connection
+        await asyncio.to_thread(ftp.login, username, password)
+        return ftp
+    
+    @asynccontextmanager
+    async def _acquire(self, conn: Dict[str, Any]):
+        """
+        Check out a pooled connection for a single transfer.
+        
+        Idle connections are reused; a new one is opened while the pool is
+        below its size, otherwise this waits for one to be returned. Pooled
+        connections stay at the login directory, so use absolute paths.
+        """
+        pool = conn["pool"]
+        if pool.empty() and conn["pool_open"] < conn["pool_size"]:
+            conn["pool_open"] += 1
+            try:
+                ftp = await self._open_ftp(conn["host"], conn["port"], conn["username"], conn["password"])
+            except BaseException:
+                conn["pool_open"] -= 1
+                raise
+        else:
+            ftp = await pool.get()
+        
+        try:
+            yield ftp
+        except (ftplib.Error, FileNotFoundError, PermissionError, IsADirectoryError):
+            # Error reply from the server or a local file that could not be
+            # opened; the connection itself is still usable
+            pool.put_nowait(ftp)
+            raise
+        except BaseException:
+            # Broken or interrupted transfer; drop it so the next one opens a fresh connection
+            conn["pool_open"] -= 1
+            ftp.close()
+            raise
+        else:
+            pool.put_nowait(ftp)
+    
+    @asynccontextmanager
+    async def _keepalive(self, conn: Dict[str, Any]):
+        """
+        Send NOOP on the primary connection every KEEPALIVE_INTERVAL seconds while the block runs.
+        
+        Transfers run on pooled connections, so the primary control session sits
+        idle and would hit the server's idle timeout during a long upload or download.
+        """
+        stop = asyncio.Event()
+        
+        async def noop_loop():
+            while True:
+                try:
+                    await asyncio.wait_for(stop.wait(), KEEPALIVE_INTERVAL)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self._call(conn, conn["ftp"].voidcmd, "NOOP")
+                except ftplib.all_errors as e:
+                    # _call has already tried to reconnect; keep going so a later NOOP can succeed
+                    self.logger.warning(f"Keepalive NOOP failed on {conn['name']}: {e}")
+        
+        task = asyncio.create_task(noop_loop())
+        try:
+            yield
+        finally:
+            stop.set()
+            # Let an in-flight NOOP finish so the control connection is not left mid-reply
+            await task
+    
+    def _absolute_path(self, conn: Dict[str, Any], remote_path: str) -> str:
+        """Resolve a remote path against the connection's current directory."""
+        return posixpath.join(conn["current_dir"], remote_path)
+    
+    def _invalidate_listing(self, connection_name: str, remote_path: Optional[str] = None) -> None:
+        """
+        Drop cached listings affected by a change to remote_path.
+        
+        That is the parent directory, the path itself and anything below it.
+        Without a path every listing for the connection is dropped.
+        """
+        if remote_path is None:
+            stale = [key for key in self._listing_cache if key[0] == connection_name]
+        else:
+            path = posixpath.normpath(remote_path)
+            parent = posixpath.dirname(path)
+            prefix = path.rstrip('/') + '/'
+            stale = [
+                key for key in self._listing_cache
+                if key[0] == connection_name
+                and (key[1] in (parent, path) or key[1].startswith(prefix))
+            ]
+        for key in stale:
+            del self._listing_cache[key]
+    
+    def _forget_dirs(self, conn: Dict[str, Any], remote_path: str) -> None:
+        """Drop remote_path and everything below it from the known directories."""
+        path = posixpath.normpath(remote_path)
+        prefix = path.rstrip('/') + '/'
+        conn["known_dirs"] = {
+            known for known in conn["known_dirs"]
+            if known != path and not known.startswith(prefix)
+        }
+    
+    async def _ensure_dirs(self, conn: Dict[str, Any], remote_dirs: List[str]) -> None:
+        """
+        Issue MKD for each absolute remote directory not already known to exist.
+        
+        This is a setup phase run before any file is sent. Directories are
+        created one depth level at a time, with the MKDs of a level spread over
+        the connection pool, and remembered on the connection so repeated
+        uploads into the same tree skip the round trips entirely.
+        """
+        async def make_dir(remote_dir):
+            async with self._acquire(conn) as ftp:
+                try:
+                    await asyncio.to_thread(ftp.mkd, remote_dir)
+                except ftplib.error_perm:
+                    # Directory might already exist; otherwise leave it unknown so a later upload retries
+                    if not await asyncio.to_thread(_is_dir, ftp, remote_dir):
+                        return
+            conn["known_dirs"].add(remote_dir)
+        
+        missing = sorted(set(remote_dirs) - conn["known_dirs"], key=lambda path: path.count('/'))
+        for _, level in itertools.groupby(missing, key=lambda path: path.count('/')):
+            await asyncio.gather(*(make_dir(remote_dir) for remote_dir in level))
+    
+    async def _upload_archive(self, conn: Dict[str, Any], files: List[Tuple[str, str]],
+                              remote_root: str) -> bool:
+        """
+        Upload files as a single tar.gz and unpack it on the server with SITE EXEC.
+        
+        Args:
+            conn: Connection dict
+            files: (local_file, relative_file) pairs
+            remote_root: Absolute remote directory to unpack into
+            
+        Returns:
+            True if the archive was unpacked, False if the server can't do it
+        """
+        ftp = conn["ftp"]
+        
+        # Few servers enable SITE EXEC; ask once per connection before packing anything
+        if conn["site_exec"] is None:
+            try:
+                reply = await self._call(conn, ftp.sendcmd, "SITE HELP")
+                conn["site_exec"] = "EXEC" in reply.upper()
+            except ftplib.error_perm:
+                conn["site_exec"] = False
+        if not conn["site_exec"]:
+            return False
+        
+        remote_archive = f"{remote_root}/{UPLOAD_ARCHIVE_NAME}"
+        archive = await asyncio.to_thread(_build_archive, files)
+        try:
+            await self._call(conn, ftp.storbinary, f"STOR {remote_archive}", archive, self.blocksize,
+                             retry=functools.partial(archive.seek, 0))
+        finally:
+            archive.close()
+        
+        try:
+            await self._call(conn, ftp.sendcmd,
+                             f"SITE EXEC tar xzf {shlex.quote(remote_archive)} -C {shlex.quote(remote_root)}")
+            return True
+        except ftplib.error_perm as e:
+            self.logger.warning(f"SITE EXEC extraction failed, falling back to per-file upload: {e}")
+            conn["site_exec"] = False
+            return False
+        finally:
+            try:
+                await self._call(conn, ftp.delete, remote_archive)
+            except ftplib.error_perm:
+                pass
     
     async def connect(self, host: str, username: str, password: str, port: int = 21, 
-                     connection_name: Optional[str] = None) -> Dict[str, Any]:
+                     connection_name: Optional[str] = None,
+                     pool_size: int = DEFAULT_POOL_SIZE) -> Dict[str, Any]:
         """
         Connect to an FTP server.
         
@@ -38,6 +770,7 @@ class FTPManager:
             password: FTP password
             port: FTP port (default: 21)
             connection_name: Optional name for this connection
+            pool_size: Maximum extra connections opened for concurrent transfers
             
         Returns:
             Dict with connection status and details
@@ -56,17 +789,24 @@ class FTPManager:
             
             try:
                 # Create FTP connection
-                ftp = ftplib.FTP()
-                ftp.connect(host, port, timeout=10) # Add timeout for connection
-                ftp.login(username, password)
+                ftp = await self._open_ftp(host, port, username, password)
+                current_dir = await asyncio.to_thread(ftp.pwd)
                 
                 # Store connection
                 self.connections[connection_name] = {
+                    "name": connection_name,
                     "ftp": ftp,
+                    "lock": asyncio.Lock(),
+                    "pool": asyncio.Queue(),
+                    "pool_size": pool_size,
+                    "pool_open": 0,
                     "host": host,
                     "username": username,
+                    "password": password,
                     "port": port,
-                    "current_dir": ftp.pwd()
+                    "current_dir": current_dir,
+                    "known_dirs": set(),
+                    "site_exec": None
                 }
                 
                 self.current_connection = connection_name
@@ -83,7 +823,7 @@ class FTPManager:
                     "message": f"Connected to {host}",
                     "connection_name": connection_name,
                     "welcome": welcome,
-                    "current_dir": ftp.pwd()
+                    "current_dir": current_dir
                 }
             except ftplib.all_errors as e: # Catch all ftplib-specific errors
                 error_msg = f"FTP connection failed to {host}: {str(e)}"
@@ -138,9 +878,19 @@ class FTPManager:
             }
         
         try:
-            ftp = self.connections[connection_name]["ftp"]
-            ftp.quit()
+            conn = self.connections[connection_name]
+            ftp = conn["ftp"]
+            await self._call(conn, ftp.quit)
+            
+            # Close idle pooled connections
+            while not conn["pool"].empty():
+                pooled = conn["pool"].get_nowait()
+                try:
+                    await asyncio.to_thread(pooled.quit)
+                except ftplib.all_errors:
+                    pooled.close()
             del self.connections[connection_name]
+            self._invalidate_listing(connection_name)
             
             if self.current_connection == connection_name:
                 self.current_connection = None if not self.connections else list(self.connections.keys())[0]
@@ -172,63 +922,47 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def list_files(self, remote_path: Optional[str] = None, 
-                        connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def list_files(self, conn: Dict[str, Any], remote_path: Optional[str] = None,
+                        *, force_refresh: bool = False) -> Dict[str, Any]:
         """
         List files in the specified remote directory.
         
+        Listings are cached for LISTING_CACHE_TTL seconds and invalidated by
+        changes made through this manager.
+        
         Args:
             remote_path: Remote directory path (default: current directory)
             connection_name: Name of the connection to use
+            force_refresh: Ignore any cached listing
             
         Returns:
             Dict with file listing
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
         ftp = conn["ftp"]
         
         try:
             if remote_path:
-                ftp.cwd(remote_path)
-                conn["current_dir"] = ftp.pwd()
+                conn["current_dir"] = await self._call(conn, _change_dir, ftp, remote_path, conn["current_dir"])
             
             current_dir = conn["current_dir"]
+            cache_key = (conn["name"], current_dir)
+            cached = self._listing_cache.get(cache_key)
             
-            # Get file listing
-            files = []
-            directories = []
-            
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]Fetching file listing..."),
-                console=console
-            ) as progress:
-                task = progress.add_task("list", total=None)
+            if not force_refresh and cached and time.monotonic() - cached[0] < LISTING_CACHE_TTL:
+                directories, files = cached[1]
+            else:
+                # Get file listing
+                files = []
+                directories = []
                 
-                def process_line(line):
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        # Check if it's a directory (starts with 'd')
-                        is_dir = parts[0].startswith('d')
-                        name = ' '.join(parts[8:])
-                        size = parts[4]
-                        date = ' '.join(parts[5:8])
-                        
-                        if is_dir:
-                            directories.append({"name": name, "date": date})
-                        else:
-                            files.append({"name": name, "size": size, "date": date})
+                for entry in await self._call(conn, _list_dir, ftp):
+                    if entry["is_dir"]:
+                        directories.append({"name": entry["name"], "date": entry["date"]})
+                    else:
+                        files.append({"name": entry["name"], "size": entry["size"], "date": entry["date"]})
                 
-                ftp.retrlines('LIST', process_line)
+                self._listing_cache[cache_key] = (time.monotonic(), (directories, files))
             
             # Display results in a table
             table = Table(title=f"Contents of {current_dir}")
@@ -241,7 +975,7 @@ class FTPManager:
                 table.add_row("DIR", d["name"], "", d["date"])
             
             for f in files:
-                table.add_row("FILE", f["name"], f["size"], f["date"])
+                table.add_row("FILE", f["name"], str(f["size"]), f["date"])
             
             console.print(table)
             
@@ -274,8 +1008,9 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def upload_file(self, local_path: str, remote_path: Optional[str] = None,
-                         connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def upload_file(self, conn: Dict[str, Any], local_path: str,
+                         remote_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Upload a file to the FTP server.
         
@@ -287,24 +1022,10 @@ class FTPManager:
         Returns:
             Dict with upload status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
-        ftp = conn["ftp"]
-        
         try:
-            if not os.path.exists(local_path):
-                return {
-                    "status": "error",
-                    "message": f"Local file not found: {local_path}"
-                }
+            # One stat for both the existence check and the size; a missing
+            # file raises FileNotFoundError, handled below
+            file_size = os.stat(local_path).st_size
             
             filename = os.path.basename(local_path)
             
@@ -312,28 +1033,21 @@ class FTPManager:
                 remote_path = filename
             elif remote_path.endswith('/'):
                 remote_path = remote_path + filename
+            remote_path = self._absolute_path(conn, remote_path)
             
-            # Get file size for progress tracking
-            file_size = os.path.getsize(local_path)
-            
-            with Progress(
-                TextColumn("[bold blue]Uploading..."),
-                BarColumn(),
-                TextColumn("[bold green]{task.percentage:.0f}%"),
-                console=console
-            ) as progress:
-                task = progress.add_task("upload", total=file_size)
-                
-                # Custom callback to update progress
-                uploaded = 0
-                
-                def callback(data):
-                    nonlocal uploaded
-                    uploaded += len(data)
-                    progress.update(task, completed=uploaded)
-                
-                with open(local_path, 'rb') as file:
-                    ftp.storbinary(f'STOR {remote_path}', file, 8192, callback)
+            async with self._keepalive(conn), self._acquire(conn) as ftp:
+                if file_size < PROGRESS_MIN_BYTES:
+                    await asyncio.to_thread(_store_file, ftp, local_path, remote_path, blocksize=self.blocksize)
+                else:
+                    with Progress(
+                        TextColumn("[bold blue]Uploading..."),
+                        BarColumn(),
+                        TextColumn("[bold green]{task.percentage:.0f}%"),
+                        console=console
+                    ) as progress:
+                        task = progress.add_task("upload", total=file_size)
+                        await asyncio.to_thread(_store_file, ftp, local_path, remote_path, progress, task, blocksize=self.blocksize)
+            self._invalidate_listing(conn["name"], remote_path)
             
             console.print(f"[bold green]Successfully uploaded {local_path} to {remote_path}[/bold green]")
             
@@ -371,8 +1085,9 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def download_file(self, remote_path: str, local_path: Optional[str] = None,
-                           connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def download_file(self, conn: Dict[str, Any], remote_path: str, local_path: Optional[str] = None,
+                           *, known_size: Optional[int] = None) -> Dict[str, Any]:
         """
         Download a file from the FTP server.
         
@@ -380,22 +1095,11 @@ class FTPManager:
             remote_path: Path to the remote file
             local_path: Local path (default: current directory with same filename)
             connection_name: Name of the connection to use
+            known_size: File size if already known (e.g. from list_files), used for progress
             
         Returns:
             Dict with download status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
-        ftp = conn["ftp"]
-        
         try:
             filename = os.path.basename(remote_path)
             
@@ -403,35 +1107,26 @@ class FTPManager:
                 local_path = filename
             elif os.path.isdir(local_path):
                 local_path = os.path.join(local_path, filename)
+            remote_path = self._absolute_path(conn, remote_path)
             
             # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+            await asyncio.to_thread(os.makedirs, os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
             
-            # Get file size for progress tracking (if possible)
-            try:
-                file_size = ftp.size(remote_path)
-            except:
-                file_size = 0  # Unknown size
+            # No SIZE probe; the bar is indeterminate unless the caller knows the size
+            file_size = known_size
             
-            with Progress(
-                TextColumn("[bold blue]Downloading..."),
-                BarColumn(),
-                TextColumn("[bold green]{task.percentage:.0f}%" if file_size else ""),
-                console=console
-            ) as progress:
-                task = progress.add_task("download", total=file_size if file_size else None)
-                
-                # Custom callback to update progress
-                downloaded = 0
-                
-                def callback(data):
-                    nonlocal downloaded
-                    downloaded += len(data)
-                    if file_size:
-                        progress.update(task, completed=downloaded)
-                
-                with open(local_path, 'wb') as file:
-                    ftp.retrbinary(f'RETR {remote_path}', lambda data: (file.write(data), callback(data)))
+            async with self._keepalive(conn), self._acquire(conn) as ftp:
+                if file_size is not None and file_size < PROGRESS_MIN_BYTES:
+                    await asyncio.to_thread(_retrieve_file, ftp, remote_path, local_path, blocksize=self.blocksize)
+                else:
+                    with Progress(
+                        TextColumn("[bold blue]Downloading..."),
+                        BarColumn(),
+                        TextColumn("[bold green]{task.percentage:.0f}%" if file_size else ""),
+                        console=console
+                    ) as progress:
+                        task = progress.add_task("download", total=file_size if file_size else None)
+                        await asyncio.to_thread(_retrieve_file, ftp, remote_path, local_path, progress, task, blocksize=self.blocksize)
             
             console.print(f"[bold green]Successfully downloaded {remote_path} to {local_path}[/bold green]")
             
@@ -461,38 +1156,74 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def create_directory(self, remote_path: str, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def exists(self, conn: Dict[str, Any], remote_path: str) -> Dict[str, Any]:
         """
-        Create a directory on the FTP server.
+        Check whether a file or directory exists on the FTP server.
         
         Args:
-            remote_path: Path of the directory to create
+            remote_path: Path to check
             connection_name: Name of the connection to use
             
         Returns:
-            Dict with creation status
+            Dict with status and an "exists" flag
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
+        try:
+            path = self._absolute_path(conn, remote_path)
+            async with self._acquire(conn) as ftp:
+                found = await asyncio.to_thread(_path_exists, ftp, path)
+            
+            return {
+                "status": "success",
+                "path": path,
+                "exists": found
+            }
+            
+        except ftplib.all_errors as e:
+            error_msg = f"FTP error checking {remote_path}: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            console.print(f"[bold red]Error:[/bold red] {error_msg}")
             return {
                 "status": "error",
-                "message": "No active FTP connection"
+                "message": error_msg
             }
+    
+    @_requires_connection
+    async def create_directory(self, conn: Dict[str, Any], remote_path: str) -> Dict[str, Any]:
+        """
+        Create a directory on the FTP server.
         
-        conn = self.connections[connection_name]
+        Args:
+            remote_path: Path of the directory to create
+            connection_name: Name of the connection to use
+            
+        Returns:
+            Dict with creation status
+        """
         ftp = conn["ftp"]
         
         try:
-            ftp.mkd(remote_path)
+            created = await self._call(conn, _make_dirs, ftp, remote_path, conn["current_dir"])
+            conn["known_dirs"].update(self._absolute_path(conn, path) for path in created)
+            conn["known_dirs"].add(posixpath.normpath(self._absolute_path(conn, remote_path)))
+            
+            if not created:
+                console.print(f"[yellow]Directory already exists: {remote_path}[/yellow]")
+                return {
+                    "status": "success",
+                    "message": f"Directory already exists: {remote_path}",
+                    "created": []
+                }
+            
+            self._invalidate_listing(conn["name"], self._absolute_path(conn, created[0]))
             console.print(f"[bold green]Created directory: {remote_path}[/bold green]")
             
             self.logger.info(f"Successfully created directory: {remote_path}")
             
             return {
                 "status": "success",
-                "message": f"Created directory: {remote_path}"
+                "message": f"Created directory: {remote_path}",
+                "created": created
             }
             
         except ftplib.all_errors as e:
@@ -512,7 +1243,8 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def delete_file(self, remote_path: str, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def delete_file(self, conn: Dict[str, Any], remote_path: str) -> Dict[str, Any]:
         """
         Delete a file from the FTP server.
         
@@ -523,22 +1255,13 @@ class FTPManager:
         Returns:
             Dict with deletion status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
-        ftp = conn["ftp"]
-        
         try:
             # Confirm deletion
             if Confirm.ask(f"Are you sure you want to delete {remote_path}?"):
-                ftp.delete(remote_path)
+                path = self._absolute_path(conn, remote_path)
+                async with self._acquire(conn) as ftp:
+                    await asyncio.to_thread(ftp.delete, path)
+                self._invalidate_listing(conn["name"], path)
                 console.print(f"[bold green]Deleted file: {remote_path}[/bold green]")
                 self.logger.info(f"Successfully deleted file: {remote_path}")
                 
@@ -570,7 +1293,8 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def delete_directory(self, remote_path: str, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def delete_directory(self, conn: Dict[str, Any], remote_path: str) -> Dict[str, Any]:
         """
         Delete a directory from the FTP server.
         
@@ -581,51 +1305,18 @@ class FTPManager:
         Returns:
             Dict with deletion status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
-        ftp = conn["ftp"]
-        
         try:
             # Confirm deletion
             if Confirm.ask(f"Are you sure you want to delete directory {remote_path}?"):
-                # First, we need to delete all files in the directory
-                ftp.cwd(remote_path)
-                files = []
-                
-                def process_line(line):
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        # Skip . and ..
-                        name = ' '.join(parts[8:])
-                        if name not in ['.', '..']:
-                            # Check if it's a directory (starts with 'd')
-                            is_dir = parts[0].startswith('d')
-                            files.append({"name": name, "is_dir": is_dir})
-                
-                ftp.retrlines('LIST', process_line)
-                
-                # Delete all files first
-                for file in files:
-                    if not file["is_dir"]:
-                        ftp.delete(file["name"])
-                    else:
-                        # Recursively delete subdirectories
-                        # Call asynchronously if possible, otherwise directly
-                        await self.delete_directory(f"{remote_path}/{file['name']}", connection_name)
-                
-                # Go back to parent directory
-                ftp.cwd('..')
-                
-                # Delete the directory
-                ftp.rmd(remote_path)
+                path = self._absolute_path(conn, remote_path.rstrip('/'))
+                try:
+                    # One pooled connection for the whole walk; paths are absolute
+                    async with self._acquire(conn) as ftp:
+                        await asyncio.to_thread(_remove_tree, ftp, path)
+                finally:
+                    # Part of the tree may be gone even if the walk failed
+                    self._invalidate_listing(conn["name"], path)
+                    self._forget_dirs(conn, path)
                 
                 console.print(f"[bold green]Deleted directory: {remote_path}[/bold green]")
                 self.logger.info(f"Successfully deleted directory: {remote_path}")
@@ -660,7 +1351,8 @@ class FTPManager:
                 "status": "error",
                 "message": error_msg
             }    
-    async def rename_file(self, remote_path: str, new_name: str, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def rename_file(self, conn: Dict[str, Any], remote_path: str, new_name: str) -> Dict[str, Any]:
         """
         Rename a file on the FTP server.
         
@@ -672,28 +1364,22 @@ class FTPManager:
         Returns:
             Dict with rename status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
         ftp = conn["ftp"]
         
         try:
             # Get the directory and filename
             directory = os.path.dirname(remote_path)
             if not directory:
-                directory = ftp.pwd()
+                directory = conn["current_dir"]
             
             new_path = os.path.join(directory, new_name)
             
             # Rename the file
-            ftp.rename(remote_path, new_path)
+            # A retried RNFR would fail if the first rename went through
+            await self._call(conn, ftp.rename, remote_path, new_path, retry=False)
+            self._invalidate_listing(conn["name"], self._absolute_path(conn, remote_path))
+            self._invalidate_listing(conn["name"], self._absolute_path(conn, new_path))
+            self._forget_dirs(conn, self._absolute_path(conn, remote_path))
             
             console.print(f"[bold green]Renamed {remote_path} to {new_path}[/bold green]")
             
@@ -725,7 +1411,8 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def change_directory(self, remote_path: str, connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def change_directory(self, conn: Dict[str, Any], remote_path: str) -> Dict[str, Any]:
         """
         Change the current directory on the FTP server.
         
@@ -736,21 +1423,10 @@ class FTPManager:
         Returns:
             Dict with change directory status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
-        conn = self.connections[connection_name]
         ftp = conn["ftp"]
         
         try:
-            ftp.cwd(remote_path)
-            current_dir = ftp.pwd()
+            current_dir = await self._call(conn, _change_dir, ftp, remote_path, conn["current_dir"])
             conn["current_dir"] = current_dir
             
             console.print(f"[bold green]Changed directory to: {current_dir}[/bold green]")
@@ -797,17 +1473,6 @@ class FTPManager:
                 "connections": []
             }
         
-        connections_info = []
-        
-        for name, conn in self.connections.items():
-            connections_info.append({
-                "name": name,
-                "host": conn["host"],
-                "username": conn["username"],
-                "current_dir": conn["current_dir"],
-                "is_current": name == self.current_connection
-            })
-        
         # Display connections in a table
         table = Table(title="Active FTP Connections")
         table.add_column("Name", style="cyan")
@@ -816,14 +1481,19 @@ class FTPManager:
         table.add_column("Current Directory", style="magenta")
         table.add_column("Current", style="bold")
         
-        for conn in connections_info:
-            table.add_row(
-                conn["name"],
-                conn["host"],
-                conn["username"],
-                conn["current_dir"],
-                "✓" if conn["is_current"] else ""
-            )
+        # Fill the table and the result in one pass
+        current = self.current_connection
+        connections_info = []
+        for name, conn in self.connections.items():
+            is_current = name == current
+            table.add_row(name, conn["host"], conn["username"], conn["current_dir"], "✓" if is_current else "")
+            connections_info.append({
+                "name": name,
+                "host": conn["host"],
+                "username": conn["username"],
+                "current_dir": conn["current_dir"],
+                "is_current": is_current
+            })
         
         console.print(table)
         
@@ -861,28 +1531,188 @@ class FTPManager:
             "current_dir": conn["current_dir"]
         }
     
-    async def upload_wordpress_theme(self, theme_path: str, remote_path: Optional[str] = None,
-                                   connection_name: Optional[str] = None) -> Dict[str, Any]:
+    async def _upload_site_files(self, conn: Dict[str, Any], files: List[Tuple[str, str]],
+                                 remote_root: str, description: str, archive: bool) -> Tuple[int, int]:
         """
-        Upload a WordPress theme to the FTP server.
+        Upload a scanned theme or plugin tree into remote_root.
+        
+        With archive set, files under ARCHIVE_MAX_FILE_BYTES go up as one tar.gz
+        and only the larger ones are sent individually.
+        
+        Returns:
+            (uploaded, failed) counts
+        """
+        archived = 0
+        if archive:
+            small, large = await asyncio.to_thread(_split_by_size, files, ARCHIVE_MAX_FILE_BYTES)
+            if small and await self._upload_archive(conn, small, remote_root):
+                archived = len(small)
+                files = large
+        
+        # Upload the remaining files in parallel over the connection pool
+        pending = [(local_file, f"{remote_root}/{rel_path}") for local_file, rel_path in files]
+        uploaded, failed = await self._upload_files(conn, pending, description)
+        return archived + uploaded, failed
+    
+    async def _upload_files(self, conn: Dict[str, Any], files: List[Tuple[str, str]],
+                            description: str) -> Tuple[int, int]:
+        """
+        Upload (local_file, remote_file) pairs concurrently over the connection pool.
+        
+        Remote paths must be absolute and their directories must exist.
+        
+        Returns:
+            Tuple of (uploaded_files, failed_files)
+        """
+        queue = asyncio.Queue()
+        for item in files:
+            queue.put_nowait(item)
+        
+        uploaded_files = 0
+        failed_files = 0
+        
+        with Progress(
+            TextColumn(f"[bold blue]{description}"),
+            BarColumn(),
+            TextColumn("[bold green]{task.completed}/{task.total} files"),
+            console=console
+        ) as progress:
+            task = progress.add_task("upload", total=len(files))
+            
+            async def worker():
+                nonlocal uploaded_files, failed_files
+                async with self._acquire(conn) as ftp:
+                    while not queue.empty():
+                        local_file, remote_file = queue.get_nowait()
+                        try:
+                            await asyncio.to_thread(_store_file, ftp, local_file, remote_file, blocksize=self.blocksize)
+                            uploaded_files += 1
+                        except (ftplib.error_perm, FileNotFoundError, PermissionError) as e:
+                            self.logger.error(f"Error uploading {local_file}: {str(e)}")
+                            failed_files += 1
+                        
+                        progress.update(task, advance=1)
+            
+            async with self._keepalive(conn):
+                workers = [asyncio.create_task(worker()) for _ in range(min(conn["pool_size"], len(files)))]
+                try:
+                    await asyncio.gather(*workers)
+                except BaseException:
+                    for w in workers:
+                        w.cancel()
+                    raise
+        
+        return uploaded_files, failed_files
+    
+    async def _retrieve_pooled(self, conn: Dict[str, Any], remote_file: str, local_file: str,
+                               progress: Progress, task, offset: int = 0) -> None:
+        """
+        Download one file on a pooled connection.
+        
+        A connection the server drops mid-transfer is discarded by _acquire; the
+        partial file is rewound to offset and the download retried once on a fresh one.
+        """
+        for attempt in range(2):
+            try:
+                async with self._acquire(conn) as ftp:
+                    await asyncio.to_thread(_retrieve_file, ftp, remote_file, local_file, progress, task,
+                                            blocksize=self.blocksize, offset=offset)
+                return
+            except (ConnectionError, EOFError) as e:
+                if attempt:
+                    raise
+                self.logger.warning(f"Pooled connection to {conn['host']} dropped ({e}); retrying {remote_file}")
+                await asyncio.to_thread(_rewind_download, local_file, offset, progress, task)
+    
+    @_requires_connection
+    async def upload_tree(self, conn: Dict[str, Any], local_root: str, remote_root: str) -> Dict[str, Any]:
+        """
+        Upload a local directory tree to the FTP server.
+        
+        All remote directories are created first, parents before children,
+        so each one is usually found or made in a single round trip. The
+        files are then uploaded concurrently over the connection pool.
         
         Args:
-            theme_path: Path to the local theme directory
-            remote_path: Remote path (default: wp-content/themes/)
+            local_root: Path to the local directory
+            remote_root: Remote directory to upload into
             connection_name: Name of the connection to use
             
         Returns:
             Dict with upload status
         """
-        if not connection_name:
-            connection_name = self.current_connection
+        if not os.path.isdir(local_root):
+            return {
+                "status": "error",
+                "message": f"Local directory not found: {local_root}"
+            }
         
-        if not connection_name or connection_name not in self.connections:
+        remote_root = self._absolute_path(conn, remote_root.rstrip('/') or '/')
+        
+        try:
+            dirs, files = await asyncio.to_thread(_collect_tree, local_root, remote_root)
+            
+            async with self._acquire(conn) as ftp:
+                for remote_dir in dirs:
+                    if remote_dir not in conn["known_dirs"]:
+                        # _make_dirs raises unless the directory exists when it returns
+                        created = await asyncio.to_thread(_make_dirs, ftp, remote_dir, conn["current_dir"])
+                        conn["known_dirs"].update(created)
+                        conn["known_dirs"].add(remote_dir)
+            
+            uploaded_files, failed_files = await self._upload_files(conn, files, "Uploading files...")
+            
+            self._invalidate_listing(conn["name"], remote_root)
+            
+            result_message = f"Upload complete: {uploaded_files} files uploaded to {remote_root}"
+            if failed_files > 0:
+                result_message += f", {failed_files} files failed"
+            
+            console.print(f"[bold green]{result_message}[/bold green]")
+            self.logger.info(result_message)
+            
+            return {
+                "status": "success",
+                "message": result_message,
+                "remote_path": remote_root,
+                "uploaded_files": uploaded_files,
+                "failed_files": failed_files
+            }
+            
+        except ftplib.all_errors as e:
+            error_msg = f"FTP error uploading {local_root} to {remote_root}: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            console.print(f"[bold red]Error:[/bold red] {error_msg}")
             return {
                 "status": "error",
-                "message": "No active FTP connection"
+                "message": error_msg
+            }
+        except Exception as e:
+            error_msg = f"An unexpected error occurred while uploading directory: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            console.print(f"[bold red]Error:[/bold red] {error_msg}")
+            return {
+                "status": "error",
+                "message": error_msg
             }
+    
+    @_requires_connection
+    async def upload_wordpress_theme(self, conn: Dict[str, Any], theme_path: str,
+                                   remote_path: Optional[str] = None,
+                                   archive: bool = False) -> Dict[str, Any]:
+        """
+        Upload a WordPress theme to the FTP server.
         
+        Args:
+            theme_path: Path to the local theme directory
+            remote_path: Remote path (default: wp-content/themes/)
+            archive: Send the theme's small files as one tar.gz and unpack it with
+                SITE EXEC, falling back to per-file uploads if the server doesn't allow it
+            connection_name: Name of the connection to use
+            
+        Returns:
+            Dict with upload status
+        """
         if not os.path.isdir(theme_path):
             return {
                 "status": "error",
@@ -898,61 +1728,17 @@ class FTPManager:
         theme_remote_path = f"{remote_path}/{theme_name}"
         
         try:
-            conn = self.connections[connection_name]
-            ftp = conn["ftp"]
+            remote_root = self._absolute_path(conn, theme_remote_path)
             
-            # Create theme directory on server
-            try:
-                ftp.mkd(theme_remote_path)
-            except:
-                # Directory might already exist
-                pass
+            # Enumerate the local tree once, then create the remote directories we haven't seen
+            dirs, files = await asyncio.to_thread(_scan_local_tree, theme_path)
+            await self._ensure_dirs(conn, [remote_root] + [f"{remote_root}/{rel_dir}" for rel_dir in dirs])
             
-            # Upload all theme files
-            uploaded_files = 0
-            failed_files = 0
+            uploaded_files, failed_files = await self._upload_site_files(
+                conn, files, remote_root, "Uploading theme...", archive
+            )
             
-            with Progress(
-                TextColumn("[bold blue]Uploading theme..."),
-                BarColumn(),
-                TextColumn("[bold green]{task.completed}/{task.total} files"),
-                console=console
-            ) as progress:
-                # Count total files
-                total_files = 0
-                for root, _, files in os.walk(theme_path):
-                    total_files += len(files)
-                
-                task = progress.add_task("upload", total=total_files)
-                
-                for root, dirs, files in os.walk(theme_path):
-                    # Create remote directories
-                    for dir_name in dirs:
-                        local_dir = os.path.join(root, dir_name)
-                        rel_path = os.path.relpath(local_dir, theme_path)
-                        remote_dir = f"{theme_remote_path}/{rel_path.replace(os.sep, '/')}"
-                        
-                        try:
-                            ftp.mkd(remote_dir)
-                        except:
-                            # Directory might already exist
-                            pass
-                    
-                    # Upload files
-                    for file_name in files:
-                        local_file = os.path.join(root, file_name)
-                        rel_path = os.path.relpath(local_file, theme_path)
-                        remote_file = f"{theme_remote_path}/{rel_path.replace(os.sep, '/')}"
-                        
-                        try:
-                            with open(local_file, 'rb') as file:
-                                ftp.storbinary(f'STOR {remote_file}', file)
-                            uploaded_files += 1
-                        except Exception as e:
-                            self.logger.error(f"Error uploading {local_file}: {str(e)}")
-                            failed_files += 1
-                        
-                        progress.update(task, advance=1)
+            self._invalidate_listing(conn["name"], remote_root)
             
             result_message = f"Theme upload complete: {uploaded_files} files uploaded"
             if failed_files > 0:
@@ -979,28 +1765,23 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def upload_wordpress_plugin(self, plugin_path: str, remote_path: Optional[str] = None,
-                                    connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def upload_wordpress_plugin(self, conn: Dict[str, Any], plugin_path: str,
+                                    remote_path: Optional[str] = None,
+                                    archive: bool = False) -> Dict[str, Any]:
         """
         Upload a WordPress plugin to the FTP server.
         
         Args:
             plugin_path: Path to the local plugin directory
             remote_path: Remote path (default: wp-content/plugins/)
+            archive: Send the plugin's small files as one tar.gz and unpack it with
+                SITE EXEC, falling back to per-file uploads if the server doesn't allow it
             connection_name: Name of the connection to use
             
         Returns:
             Dict with upload status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
         if not os.path.isdir(plugin_path):
             return {
                 "status": "error",
@@ -1016,61 +1797,17 @@ class FTPManager:
         plugin_remote_path = f"{remote_path}/{plugin_name}"
         
         try:
-            conn = self.connections[connection_name]
-            ftp = conn["ftp"]
+            remote_root = self._absolute_path(conn, plugin_remote_path)
             
-            # Create plugin directory on server
-            try:
-                ftp.mkd(plugin_remote_path)
-            except:
-                # Directory might already exist
-                pass
+            # Enumerate the local tree once, then create the remote directories we haven't seen
+            dirs, files = await asyncio.to_thread(_scan_local_tree, plugin_path)
+            await self._ensure_dirs(conn, [remote_root] + [f"{remote_root}/{rel_dir}" for rel_dir in dirs])
             
-            # Upload all plugin files
-            uploaded_files = 0
-            failed_files = 0
+            uploaded_files, failed_files = await self._upload_site_files(
+                conn, files, remote_root, "Uploading plugin...", archive
+            )
             
-            with Progress(
-                TextColumn("[bold blue]Uploading plugin..."),
-                BarColumn(),
-                TextColumn("[bold green]{task.completed}/{task.total} files"),
-                console=console
-            ) as progress:
-                # Count total files
-                total_files = 0
-                for root, _, files in os.walk(plugin_path):
-                    total_files += len(files)
-                
-                task = progress.add_task("upload", total=total_files)
-                
-                for root, dirs, files in os.walk(plugin_path):
-                    # Create remote directories
-                    for dir_name in dirs:
-                        local_dir = os.path.join(root, dir_name)
-                        rel_path = os.path.relpath(local_dir, plugin_path)
-                        remote_dir = f"{plugin_remote_path}/{rel_path.replace(os.sep, '/')}"
-                        
-                        try:
-                            ftp.mkd(remote_dir)
-                        except:
-                            # Directory might already exist
-                            pass
-                    
-                    # Upload files # Upload files
-                    for file_name in files:
-                        local_file = os.path.join(root, file_name)
-                        rel_path = os.path.relpath(local_file, plugin_path)
-                        remote_file = f"{plugin_remote_path}/{rel_path.replace(os.sep, '/')}"
-                        
-                        try:
-                            with open(local_file, 'rb') as file:
-                                ftp.storbinary(f'STOR {remote_file}', file)
-                            uploaded_files += 1
-                        except Exception as e:
-                            self.logger.error(f"Error uploading {local_file}: {str(e)}")
-                            failed_files += 1
-                        
-                        progress.update(task, advance=1)
+            self._invalidate_listing(conn["name"], remote_root)
             
             result_message = f"Plugin upload complete: {uploaded_files} files uploaded"
             if failed_files > 0:
@@ -1097,158 +1834,159 @@ class FTPManager:
                 "message": error_msg
             }
     
-    async def backup_wordpress_site(self, backup_dir: str, remote_path: str = "/", 
-                                  connection_name: Optional[str] = None) -> Dict[str, Any]:
+    @_requires_connection
+    async def backup_wordpress_site(self, conn: Dict[str, Any], backup_dir: str,
+                                  remote_path: str = "/", resume: bool = False) -> Dict[str, Any]:
         """
         Backup a WordPress site from the FTP server.
         
+        Progress is recorded in a .resume.json sidecar that is removed once every
+        file has been downloaded.
+        
         Args:
             backup_dir: Local directory to store the backup
             remote_path: Remote path to backup (default: root directory)
+            resume: Continue the newest unfinished backup of remote_path in backup_dir,
+                skipping finished files and restarting partial ones with REST
             connection_name: Name of the connection to use
             
         Returns:
             Dict with backup status
         """
-        if not connection_name:
-            connection_name = self.current_connection
-        
-        if not connection_name or connection_name not in self.connections:
-            return {
-                "status": "error",
-                "message": "No active FTP connection"
-            }
-        
         # Create backup directory if it doesn't exist
         os.makedirs(backup_dir, exist_ok=True)
         
-        conn = self.connections[connection_name]
         ftp = conn["ftp"]
         
         try:
-            # Save current directory
-            original_dir = conn["current_dir"]
+            root = self._absolute_path(conn, remote_path)
             
-            # Change to the specified remote directory
-            ftp.cwd(remote_path)
+            backup_path, completed = None, set()
+            if resume:
+                backup_path, completed = await asyncio.to_thread(_find_resumable_backup, backup_dir, root)
+            resuming = backup_path is not None
             
-            # Get timestamp for backup folder
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_name = f"wp_backup_{timestamp}"
-            backup_path = os.path.join(backup_dir, backup_name)
-            os.makedirs(backup_path, exist_ok=True)
+            if not resuming:
+                # Get timestamp for backup folder
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                backup_name = f"wp_backup_{timestamp}"
+                backup_path = os.path.join(backup_dir, backup_name)
+                os.makedirs(backup_path, exist_ok=True)
             
             # Start backup process
             console.print(f"[bold blue]Starting WordPress backup to {backup_path}[/bold blue]")
             
+            # Paths are built by slicing on the prefixes; only Windows needs separators swapped
+            remote_prefix = root.rstrip('/') + '/'
+            local_prefix = backup_path + os.sep
+            native_sep = os.sep == '/'
+            
+            await asyncio.to_thread(_save_backup_state, backup_path, root, completed)
+            
             # Track statistics
             downloaded_files = 0
             failed_files = 0
-            
-            # Recursive function to download directory contents
-            async def download_directory(remote_dir, local_dir, progress_task=None):
-                nonlocal downloaded_files, failed_files
-                
-                # Create local directory
-                os.makedirs(local_dir, exist_ok=True)
-                
-                # Change to remote directory
-                ftp.cwd(remote_dir)
-                
-                # Get file listing
-                files = []
-                directories = []
-                
-                def process_line(line):
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        # Skip . and ..
-                        name = ' '.join(parts[8:])
-                        if name not in ['.', '..']:
-                            is_dir = parts[0].startswith('d')
-                            if is_dir:
-                                directories.append(name)
-                            else:
-                                files.append(name)
-                
-                ftp.retrlines('LIST', process_line)
-                
-                # Download files
-                for file_name in files:
-                    remote_file = f"{remote_dir}/{file_name}"
-                    local_file = os.path.join(local_dir, file_name)
-                    
-                    try:
-                        with open(local_file, 'wb') as file:
-                            ftp.retrbinary(f'RETR {file_name}', file.write)
-                        downloaded_files += 1
-                        if progress_task:
-                            progress.update(progress_task, advance=1)
-                    except Exception as e:
-                        self.logger.error(f"Error downloading {remote_file}: {str(e)}")
-                        failed_files += 1
+            skipped_files = 0
+            pending_state = 0
+            finished = False
+            
+            # Walk the tree on the primary connection, collecting the files still to download
+            pending = []
+            total_bytes = 0
+            stack = [""]
+            while stack:
+                rel_dir = stack.pop()
+                entries = await self._call(conn, _list_dir, ftp, remote_prefix + rel_dir if rel_dir else root)
                 
-                # Process subdirectories
-                for dir_name in directories:
-                    next_remote_dir = f"{remote_dir}/{dir_name}"
-                    next_local_dir = os.path.join(local_dir, dir_name)
-                    await download_directory(next_remote_dir, next_local_dir, progress_task)
+                if rel_dir:
+                    local_dir = local_prefix + (rel_dir if native_sep else rel_dir.replace('/', os.sep))
+                    await asyncio.to_thread(os.makedirs, local_dir, exist_ok=True)
                 
-                # Go back to parent directory
-                ftp.cwd('..')
-            
-            # Count total files for progress tracking
-            total_files = 0
+                for entry in entries:
+                    rel_path = f"{rel_dir}/{entry['name']}" if rel_dir else entry["name"]
+                    if entry["is_dir"]:
+                        stack.append(rel_path)
+                    elif rel_path in completed:
+                        skipped_files += 1
+                    else:
+                        pending.append((rel_path, entry["size"]))
+                        total_bytes += entry["size"]
             
-            def count_files(dir_path):
-                nonlocal total_files
-                
-                ftp.cwd(dir_path)
-                
-                files = []
-                directories = []
-                
-                def process_line(line):
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        name = ' '.join(parts[8:])
-                        if name not in ['.', '..']:
-                            is_dir = parts[0].startswith('d')
-                            if is_dir:
-                                directories.append(name)
-                            else:
-                                files.append(name)
-                                total_files += 1
-                
-                ftp.retrlines('LIST', process_line)
-                
-                for dir_name in directories:
-                    count_files(f"{dir_path}/{dir_name}")
-                
-                ftp.cwd('..')
+            queue = asyncio.Queue()
+            for item in pending:
+                queue.put_nowait(item)
+            state_lock = asyncio.Lock()
             
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]Counting files..."),
-                console=console
-            ) as progress:
-                progress.add_task("count", total=None)
-                count_files(remote_path)
+            async def save_state():
+                # Snapshot on the loop; workers keep adding to completed while the file is written
+                async with state_lock:
+                    await asyncio.to_thread(_save_backup_state, backup_path, root, set(completed))
             
-            # Start download with progress tracking
+            # Download in parallel over the connection pool
             with Progress(
                 TextColumn("[bold blue]Backing up WordPress site..."),
                 BarColumn(),
-                TextColumn("[bold green]{task.completed}/{task.total} files"),
+                TextColumn("[bold green]{task.percentage:.0f}%"),
                 console=console
             ) as progress:
-                task = progress.add_task("backup", total=total_files)
-                await download_directory(remote_path, backup_path, task)
-            
-            # Restore original directory
-            ftp.cwd(original_dir)
+                task = progress.add_task("backup", total=total_bytes)
+                
+                async def worker():
+                    nonlocal downloaded_files, failed_files, pending_state
+                    while not queue.empty():
+                        rel_file, size = queue.get_nowait()
+                        remote_file = remote_prefix + rel_file
+                        local_file = local_prefix + (rel_file if native_sep else rel_file.replace('/', os.sep))
+                        
+                        # Pick up partial files left by the interrupted run where they stopped
+                        offset = 0
+                        if resuming:
+                            try:
+                                offset = os.path.getsize(local_file)
+                            except OSError:
+                                pass
+                            if offset > size:
+                                offset = 0
+                        
+                        try:
+                            if offset < size or size == 0:
+                                progress.update(task, advance=offset)
+                                await self._retrieve_pooled(conn, remote_file, local_file, progress, task, offset)
+                            else:
+                                progress.update(task, advance=size)
+                            downloaded_files += 1
+                            completed.add(rel_file)
+                            pending_state += 1
+                        except (ftplib.error_perm, FileNotFoundError, PermissionError, IsADirectoryError) as e:
+                            self.logger.error(f"Error downloading {remote_file}: {str(e)}")
+                            failed_files += 1
+                        
+                        if pending_state >= BACKUP_STATE_INTERVAL:
+                            pending_state = 0
+                            await save_state()
+                
+                try:
+                    async with self._keepalive(conn):
+                        workers = [asyncio.create_task(worker()) for _ in range(min(conn["pool_size"], len(pending)))]
+                        try:
+                            await asyncio.gather(*workers)
+                        except BaseException:
+                            for w in workers:
+                                w.cancel()
+                            raise
+                    finished = True
+                finally:
+                    if failed_files or not finished:
+                        await save_state()
+                    else:
+                        try:
+                            await asyncio.to_thread(os.remove, os.path.join(backup_path, BACKUP_STATE_FILE))
+                        except FileNotFoundError:
+                            pass
             
             result_message = f"Backup complete: {downloaded_files} files downloaded to {backup_path}"
+            if skipped_files > 0:
+                result_message += f", {skipped_files} already present"
             if failed_files > 0:
                 result_message += f", {failed_files} files failed"
             
@@ -1259,6 +1997,7 @@ class FTPManager:
                 "message": result_message,
                 "backup_path": backup_path,
                 "downloaded_files": downloaded_files,
+                "skipped_files": skipped_files,
                 "failed_files": failed_files
             }
             
@@ -1276,22 +2015,8 @@ class FTPManager:
         """
         Start an interactive FTP session with a visual terminal interface.
         """
-        # Define command completions
-        commands = [
-            "connect", "disconnect", "list", "upload", "download", "mkdir", 
-            "rmdir", "delete", "rename", "cd", "pwd", "connections", "switch",
-            "upload-theme", "upload-plugin", "backup", "help", "exit"
-        ]
-        
-        command_completer = WordCompleter(commands)
-        
-        # Define prompt style
-        style = Style.from_dict({
-            'prompt': 'bold cyan',
-        })
-        
         # Create session
-        session = PromptSession(completer=command_completer, style=style)
+        session = PromptSession(completer=self._COMPLETER, style=self._STYLE)
         
         console.print(Panel.fit(
             "[bold green]WordPress FTP Manager Interactive Mode[/bold green]\n"
@@ -1318,159 +2043,192 @@ class FTPManager:
                 args = parts[1:]
                 
                 # Process commands
-                if cmd == "exit":
-                    # Disconnect all connections before exiting
-                    for conn_name in list(self.connections.keys()):
-                        await self.disconnect(conn_name)
-                    
-                    console.print("[bold green]Exiting FTP Manager[/bold green]")
-                    break
-                
-                elif cmd == "help":
-                    self._show_help()
-                
-                elif cmd == "connect":
-                    # Interactive connection
-                    host = Prompt.ask("Host")
-                    username = Prompt.ask("Username")
-                    # Log username but not password for security
-                    self.logger.info(f"Interactive connect prompt: Host={host}, User={username}")
-                    password = Prompt.ask("Password", password=True) 
-                    port = Prompt.ask("Port", default="21")
-                    name = Prompt.ask("Connection name (optional)", default="")
-            
-                    await self.connect(
-                        host=host,
-                        username=username,
-                        password=password,
-                        port=int(port),
-                        connection_name=name if name else None
-                    )
-                
-                elif cmd == "disconnect":
-                    if len(args) > 0:
-                        await self.disconnect(args[0])
-                    else:
-                        await self.disconnect()
-                
-                elif cmd == "list":
-                    if len(args) > 0:
-                        await self.list_files(args[0])
-                    else:
-                        await self.list_files()
-                
-                elif cmd == "upload":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing local file path[/bold red]")
-                        continue
-                    
-                    local_path = args[0]
-                    remote_path = args[1] if len(args) > 1 else None
-                    
-                    await self.upload_file(local_path, remote_path)
-                
-                elif cmd == "download":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing remote file path[/bold red]")
-                        continue
-                    
-                    remote_path = args[0]
-                    local_path = args[1] if len(args) > 1 else None
-                    
-                    await self.download_file(remote_path, local_path)
-                
-                elif cmd == "mkdir" or cmd == "md":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing directory name[/bold red]")
-                        continue
-                    
-                    await self.create_directory(args[0])
-                
-                elif cmd == "rmdir" or cmd == "rd":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing directory name[/bold red]")
-                        continue
-                    
-                    await self.delete_directory(args[0])
-                
-                elif cmd == "delete" or cmd == "del" or cmd == "rm":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing file name[/bold red]")
-                        continue
-                    
-                    await self.delete_file(args[0])
-                
-                elif cmd == "rename" or cmd == "ren":
-                    if len(args) < 2:
-                        console.print("[bold red]Error: Missing file name or new name[/bold red]")
-                        continue
-                    
-                    await self.rename_file(args[0], args[1])
-                
-                elif cmd == "cd":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing directory path[/bold red]")
-                        continue
-                    
-                    await self.change_directory(args[0])
-                
-                elif cmd == "pwd":
-                    if not self.current_connection:
-                        console.print("[bold red]Error: Not connected[/bold red]")
-                        continue
-                    
-                    conn = self.connections[self.current_connection]
-                    console.print(f"Current directory: [bold green]{conn['current_dir']}[/bold green]")
-                
-                elif cmd == "connections":
-                    await self.list_connections()
-                
-                elif cmd == "switch":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing connection name[/bold red]")
-                        continue
-                    
-                    await self.switch_connection(args[0])
-                
-                elif cmd == "upload-theme":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing theme directory path[/bold red]")
-                        continue
-                    
-                    theme_path = args[0]
-                    remote_path = args[1] if len(args) > 1 else None
-                    
-                    await self.upload_wordpress_theme(theme_path, remote_path)
-                
-                elif cmd == "upload-plugin":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing plugin directory path[/bold red]")
-                        continue
-                    
-                    plugin_path = args[0]
-                    remote_path = args[1] if len(args) > 1 else None
-                    
-                    await self.upload_wordpress_plugin(plugin_path, remote_path)
-                
-                elif cmd == "backup":
-                    if len(args) < 1:
-                        console.print("[bold red]Error: Missing backup directory path[/bold red]")
-                        continue
-                    
-                    backup_dir = args[0]
-                    remote_path = args[1] if len(args) > 1 else "/"
-                    
-                    await self.backup_wordpress_site(backup_dir, remote_path)
-                
-                else:
+                handler = self._DISPATCH.get(cmd)
+                if handler is None:
                     console.print(f"[bold red]Unknown command: {cmd}[/bold red]")
                     console.print("Type [bold]help[/bold] for a list of commands")
+                elif await handler(self, args):
+                    break
             
             except KeyboardInterrupt:
                 console.print("\n[bold yellow]Operation cancelled[/bold yellow]")
             except Exception as e:
                 console.print(f"[bold red]Error: {str(e)}[/bold red]")
     
+    # Interactive command handlers. Each takes the command arguments and
+    # returns True to leave interactive mode.
+    
+    async def _cmd_exit(self, args: List[str]) -> bool:
+        # Disconnect all connections before exiting
+        for conn_name in list(self.connections.keys()):
+            await self.disconnect(conn_name)
+        
+        console.print("[bold green]Exiting FTP Manager[/bold green]")
+        return True
+    
+    async def _cmd_help(self, args: List[str]) -> None:
+        self._show_help()
+    
+    async def _cmd_connect(self, args: List[str]) -> None:
+        # Interactive connection
+        host = Prompt.ask("Host")
+        username = Prompt.ask("Username")
+        # Log username but not password for security
+        self.logger.info(f"Interactive connect prompt: Host={host}, User={username}")
+        password = Prompt.ask("Password", password=True) 
+        port = Prompt.ask("Port", default="21")
+        name = Prompt.ask("Connection name (optional)", default="")
+        
+        await self.connect(
+            host=host,
+            username=username,
+            password=password,
+            port=int(port),
+            connection_name=name if name else None
+        )
+    
+    async def _cmd_disconnect(self, args: List[str]) -> None:
+        if len(args) > 0:
+            await self.disconnect(args[0])
+        else:
+            await self.disconnect()
+    
+    async def _cmd_list(self, args: List[str]) -> None:
+        if len(args) > 0:
+            await self.list_files(args[0])
+        else:
+            await self.list_files()
+    
+    async def _cmd_upload(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing local file path[/bold red]")
+            return
+        
+        local_path = args[0]
+        remote_path = args[1] if len(args) > 1 else None
+        
+        await self.upload_file(local_path, remote_path)
+    
+    async def _cmd_download(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing remote file path[/bold red]")
+            return
+        
+        remote_path = args[0]
+        local_path = args[1] if len(args) > 1 else None
+        
+        await self.download_file(remote_path, local_path)
+    
+    async def _cmd_mkdir(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing directory name[/bold red]")
+            return
+        
+        await self.create_directory(args[0])
+    
+    async def _cmd_rmdir(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing directory name[/bold red]")
+            return
+        
+        await self.delete_directory(args[0])
+    
+    async def _cmd_delete(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing file name[/bold red]")
+            return
+        
+        await self.delete_file(args[0])
+    
+    async def _cmd_rename(self, args: List[str]) -> None:
+        if len(args) < 2:
+            console.print("[bold red]Error: Missing file name or new name[/bold red]")
+            return
+        
+        await self.rename_file(args[0], args[1])
+    
+    async def _cmd_cd(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing directory path[/bold red]")
+            return
+        
+        await self.change_directory(args[0])
+    
+    async def _cmd_pwd(self, args: List[str]) -> None:
+        if not self.current_connection:
+            console.print("[bold red]Error: Not connected[/bold red]")
+            return
+        
+        conn = self.connections[self.current_connection]
+        console.print(f"Current directory: [bold green]{conn['current_dir']}[/bold green]")
+    
+    async def _cmd_connections(self, args: List[str]) -> None:
+        await self.list_connections()
+    
+    async def _cmd_switch(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing connection name[/bold red]")
+            return
+        
+        await self.switch_connection(args[0])
+    
+    async def _cmd_upload_theme(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing theme directory path[/bold red]")
+            return
+        
+        theme_path = args[0]
+        remote_path = args[1] if len(args) > 1 else None
+        
+        await self.upload_wordpress_theme(theme_path, remote_path)
+    
+    async def _cmd_upload_plugin(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing plugin directory path[/bold red]")
+            return
+        
+        plugin_path = args[0]
+        remote_path = args[1] if len(args) > 1 else None
+        
+        await self.upload_wordpress_plugin(plugin_path, remote_path)
+    
+    async def _cmd_backup(self, args: List[str]) -> None:
+        if len(args) < 1:
+            console.print("[bold red]Error: Missing backup directory path[/bold red]")
+            return
+        
+        backup_dir = args[0]
+        remote_path = args[1] if len(args) > 1 else "/"
+        
+        await self.backup_wordpress_site(backup_dir, remote_path)
+    
+    # Command name (and alias) -> handler, looked up once per command line
+    _DISPATCH = {
+        "exit": _cmd_exit,
+        "help": _cmd_help,
+        "connect": _cmd_connect,
+        "disconnect": _cmd_disconnect,
+        "list": _cmd_list,
+        "upload": _cmd_upload,
+        "download": _cmd_download,
+        "mkdir": _cmd_mkdir,
+        "md": _cmd_mkdir,
+        "rmdir": _cmd_rmdir,
+        "rd": _cmd_rmdir,
+        "delete": _cmd_delete,
+        "del": _cmd_delete,
+        "rm": _cmd_delete,
+        "rename": _cmd_rename,
+        "ren": _cmd_rename,
+        "cd": _cmd_cd,
+        "pwd": _cmd_pwd,
+        "connections": _cmd_connections,
+        "switch": _cmd_switch,
+        "upload-theme": _cmd_upload_theme,
+        "upload-plugin": _cmd_upload_plugin,
+        "backup": _cmd_backup,
+    }
+    
     def _show_help(self) -> None:
         """Display help information for interactive mode."""
         help_text = """
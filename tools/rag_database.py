@@ -4,11 +4,17 @@ import logging
 import datetime
 import shutil
 import time
+import asyncio
+import threading
+import glob
+import queue
 from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
 import sqlite3
 import pickle
 import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from rich.console import Console
 from rich.panel import Panel
@@ -24,8 +30,94 @@ try:
 except ImportError:
     EMBEDDINGS_AVAILABLE = False
 
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    # sentence-transformers' ONNX backend runs through optimum
+    import onnxruntime
+    import optimum
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 console = Console()
 
+# Sentence embedding model and its int8 ONNX export on the Hugging Face hub
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+ONNX_MODEL_FILE = 'onnx/model_quint8_avx2.onnx'
+
+# Minimum cosine similarity for a semantic match
+SIMILARITY_THRESHOLD = 0.7
+
+# int8 rows dequantized per block when scoring, sized to stay in cache
+SCORE_BLOCK_ROWS = 4096
+
+# int8 shortlist rescored against the float32 embeddings, per requested result
+RERANK_FACTOR = 4
+
+# Worst-case int8 scoring error allowed below SIMILARITY_THRESHOLD when shortlisting
+QUANTIZATION_MARGIN = 0.02
+
+# Query embeddings and complete search results kept in memory
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+RESULT_CACHE_SIZE = 256
+
+# Cached results are reused for a new query this similar to an earlier one
+SEMANTIC_CACHE_THRESHOLD = 0.97
+
+# Random hyperplanes hashing query embeddings into semantic cache buckets
+LSH_HYPERPLANES = 16
+
+# Texts per forward pass when encoding in bulk
+EMBEDDING_BATCH_SIZE = 64
+
+# Rows encoded and written per transaction by rebuild_embeddings
+REBUILD_BATCH_SIZE = 1024
+
+# Read-only connections searches borrow so they run alongside the writer under WAL
+READ_POOL_SIZE = 4
+
+# Tables with an embedding column
+EMBEDDING_TABLES = ('documents', 'code_snippets', 'wp_functions', 'wp_hooks')
+
+# Columns indexed for keyword search in each table's FTS5 shadow table
+FTS_COLUMNS = {
+    'documents': ('title', 'content'),
+    'code_snippets': ('title', 'code', 'description'),
+    'wp_functions': ('function_name', 'signature', 'description'),
+    'wp_hooks': ('hook_name', 'description'),
+}
+
+# Name columns matched by case-insensitive prefix ahead of full-text search
+NAME_COLUMNS = {
+    'wp_functions': 'function_name',
+    'wp_hooks': 'hook_name',
+}
+
+# PRAGMA user_version once embeddings are stored as unit-length raw float32 bytes
+EMBEDDING_FORMAT_VERSION = 2
+
+if NUMBA_AVAILABLE:
+    # Not parallel=True: numba's thread pool is unsafe to drive from asyncio.to_thread workers
+    @numba.njit(fastmath=True, cache=True)
+    def _score_int8(codes, scales, query, out):
+        """Dequantize and score every int8 row against the query in one fused pass."""
+        for i in range(codes.shape[0]):
+            total = 0.0
+            for j in range(codes.shape[1]):
+                total += codes[i, j] * query[j]
+            out[i] = total * scales[i]
+
 class RAGDatabase:
     """
     Retrieval-Augmented Generation (RAG) database for WordPress knowledge.
@@ -48,9 +140,34 @@ class RAGDatabase:
         self.database_path = database_path
         self.conn = None
         self.embedding_model = None
+        # 'onnx' or 'torch'; query embeddings are cached per backend since their vectors differ slightly
+        self._embedding_backend = 'none'
+        # Falls back to LIKE scans when SQLite was built without FTS5
+        self._fts_available = True
+        # table -> (row ids, faiss.IndexFlatIP or (int8 codes, row scales)), built on first semantic search
+        self._embedding_indexes: Dict[str, Any] = {}
+        # LRU caches: query hash -> embedding, (query hash, categories, limit, semantic) -> results
+        self._query_embeddings: OrderedDict = OrderedDict()
+        self._result_cache: OrderedDict = OrderedDict()
+        # (LSH bucket, categories, limit) -> result cache keys of semantic searches in that bucket
+        self._lsh_planes = None
+        self._lsh_buckets: Dict[tuple, List[tuple]] = {}
+        # table -> whether any row has an embedding, so keyword-only searches skip encoding the query
+        self._embedded_tables: Dict[str, bool] = {}
+        # Serializes writer connection use and cached-index updates across worker threads
+        self._db_lock = threading.RLock()
+        # Read-only connections for searches; bumped on every write so stale results are not cached
+        self._read_pool: queue.Queue = queue.Queue()
+        self._read_connections = 0
+        self._write_generation = 0
+        # Set inside bulk(), where writes join one transaction committed when the block exits
+        self._in_bulk = False
         
         # Initialize database
         self._initialize_database()
+        if EMBEDDINGS_AVAILABLE:
+            self._migrate_embeddings()
+        self._open_read_pool()
         
         # Load embedding model if available
         if EMBEDDINGS_AVAILABLE:
@@ -61,7 +178,7 @@ class RAGDatabase:
                     console=console
                 ) as progress:
                     progress.add_task("load", total=None)
-                    self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+                    self.embedding_model = self._load_embedding_model()
                 console.print("[bold green]Embedding model loaded successfully[/bold green]")
             except Exception as e:
                 self.logger.error(f"Error loading embedding model: {str(e)}")
@@ -72,10 +189,60 @@ class RAGDatabase:
             console.print("To enable semantic search, install the required packages:")
             console.print("[bold]pip install sentence-transformers numpy[/bold]")
     
+    def _load_embedding_model(self):
+        """Load the embedding model, preferring the int8 ONNX export when onnxruntime is installed."""
+        if ONNX_AVAILABLE:
+            try:
+                # backend= needs sentence-transformers 3.2+
+                model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend='onnx',
+                                            model_kwargs={'file_name': ONNX_MODEL_FILE})
+                self._embedding_backend = 'onnx'
+                return model
+            except Exception as e:
+                self.logger.warning(f"ONNX embedding backend unavailable, using PyTorch: {str(e)}")
+        
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        self._embedding_backend = 'torch'
+        return model
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database with WAL journaling, memory-mapped reads and a larger page cache."""
+        conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        # page_size only applies to a new database and must precede WAL
+        conn.execute("PRAGMA page_size = 8192")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        # Lets INSERT OR REPLACE fire the delete triggers that keep the FTS tables in sync
+        conn.execute("PRAGMA recursive_triggers = ON")
+        return conn
+    
+    def _open_read_pool(self) -> None:
+        """Open READ_POOL_SIZE read-only connections for searches."""
+        uri = Path(self.database_path).resolve().as_uri() + "?mode=ro"
+        for _ in range(READ_POOL_SIZE):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA mmap_size = 268435456")
+            conn.execute("PRAGMA cache_size = -16384")
+            self._read_pool.put(conn)
+            self._read_connections += 1
+    
+    def _close_read_pool(self) -> None:
+        """
+        Close the pooled read connections so the database file can be replaced.
+        
+        Waits for searches still holding a connection, so it must not be called under the database lock.
+        """
+        while self._read_connections:
+            self._read_pool.get().close()
+            self._read_connections -= 1
+    
     def _initialize_database(self) -> None:
         """Initialize the SQLite database with required tables."""
         try:
-            self.conn = sqlite3.connect(self.database_path)
+            self.conn = self._connect()
             cursor = self.conn.cursor()
             
             # Create documents table
@@ -154,12 +321,130 @@ class RAGDatabase:
             )
             ''')
             
+            # Create query_embedding_cache table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_embedding_cache (
+                query_hash BLOB PRIMARY KEY,
+                embedding BLOB NOT NULL
+            )
+            ''')
+            
+            # Case-insensitive name indexes for identifier prefix lookups
+            for table, column in NAME_COLUMNS.items():
+                cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_{table}_{column}_nocase
+                ON {table}({column} COLLATE NOCASE)
+                ''')
+            
+            # Create embedding_versions table, bumped by triggers whenever a table's embeddings change
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            ''')
+            for table in EMBEDDING_TABLES:
+                cursor.execute("INSERT OR IGNORE INTO embedding_versions (table_name) VALUES (?)", (table,))
+                bump = f"UPDATE embedding_versions SET version = version + 1 WHERE table_name = '{table}';"
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_emb_ai AFTER INSERT ON {table} BEGIN {bump} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_emb_ad AFTER DELETE ON {table} BEGIN {bump} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_emb_au AFTER UPDATE OF embedding ON {table} BEGIN {bump} END")
+            
+            # Versions restart with every new database, so sidecars are also keyed by a token
+            # generated once per database file
+            cursor.execute("CREATE TABLE IF NOT EXISTS database_identity (token TEXT NOT NULL)")
+            cursor.execute('''
+            INSERT INTO database_identity (token)
+            SELECT lower(hex(randomblob(8))) WHERE NOT EXISTS (SELECT 1 FROM database_identity)
+            ''')
+            
+            self._create_fts_tables(cursor)
+            
             self.conn.commit()
             
         except Exception as e:
             self.logger.error(f"Error initializing database: {str(e)}")
             raise
     
+    def _create_fts_tables(self, cursor: sqlite3.Cursor) -> None:
+        """Create the FTS5 tables that shadow each content table, kept in sync by triggers."""
+        for table, columns in FTS_COLUMNS.items():
+            fts = f"{table}_fts"
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f"new.{column}" for column in columns)
+            old_values = ', '.join(f"old.{column}" for column in columns)
+            
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,))
+            exists = cursor.fetchone() is not None
+            
+            try:
+                cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+                USING fts5({column_list}, content='{table}', content_rowid='id')
+                ''')
+            except sqlite3.OperationalError as e:
+                self._fts_available = False
+                self.logger.warning(f"FTS5 not available, using LIKE for keyword search: {str(e)}")
+                return
+            
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+            ''')
+            
+            # Index rows written before the FTS table existed
+            if not exists:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    
+    def _migrate_embeddings(self) -> None:
+        """Rewrite embeddings stored by older versions (pickled or unnormalized) as unit-length float32 bytes, once per database."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] >= EMBEDDING_FORMAT_VERSION:
+                return
+            
+            converted = 0
+            for table in EMBEDDING_TABLES:
+                cursor.execute(f"SELECT id, embedding FROM {table} WHERE embedding IS NOT NULL")
+                updates = []
+                for row_id, blob in cursor.fetchall():
+                    # Pickles start with the PROTO opcode (0x80) and end with STOP ('.')
+                    if blob[:1] == b'\x80' and blob[-1:] == b'.':
+                        try:
+                            vector = np.asarray(pickle.loads(blob), dtype=np.float32)
+                        except Exception:
+                            vector = np.frombuffer(blob, dtype=np.float32)
+                    else:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                    norm = np.sqrt(vector.dot(vector))
+                    if norm > 0:
+                        vector = vector / norm
+                    updates.append((vector.astype(np.float32).tobytes(), row_id))
+                cursor.executemany(f"UPDATE {table} SET embedding = ? WHERE id = ?", updates)
+                converted += len(updates)
+            
+            cursor.execute(f"PRAGMA user_version = {EMBEDDING_FORMAT_VERSION}")
+            self.conn.commit()
+            if converted:
+                self.logger.info(f"Converted {converted} embeddings to normalized float32")
+            
+        except Exception as e:
+            self.conn.rollback()
+            self.logger.error(f"Error migrating embeddings: {str(e)}")
+    
     def _generate_embedding(self, text: str) -> Optional[bytes]:
         """
         Generate an embedding for the given text.
@@ -168,25 +453,86 @@ class RAGDatabase:
             text: Text to generate embedding for
             
         Returns:
-            Pickled embedding vector or None if embedding is not available
+            Unit-length embedding as raw float32 bytes or None if embedding is not available
         """
         if not self.embedding_model:
             return None
         
         try:
-            embedding = self.embedding_model.encode(text)
-            return pickle.dumps(embedding)
+            # Normalized at encode time so cosine similarity is a plain dot product
+            embedding = self.embedding_model.encode(text, normalize_embeddings=True)
+            return np.asarray(embedding, dtype=np.float32).tobytes()
         except Exception as e:
             self.logger.error(f"Error generating embedding: {str(e)}")
             return None
     
-    def _compute_similarity(self, embedding1: bytes, embedding2: bytes) -> float:
+    def _query_embedding(self, query: str, query_hash: bytes) -> Optional[bytes]:
+        """
+        Get the embedding for a search query, from memory or the database when seen before.
+        
+        Args:
+            query: Search query
+            query_hash: blake2b digest of the query, personalized with the embedding backend
+            
+        Returns:
+            Query embedding or None if embedding is not available
+        """
+        embedding = self._query_embeddings.get(query_hash)
+        if embedding is not None:
+            self._query_embeddings.move_to_end(query_hash)
+            return embedding
+        
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT embedding FROM query_embedding_cache WHERE query_hash = ?", (query_hash,))
+            row = cursor.fetchone()
+        if row:
+            embedding = row[0]
+        else:
+            embedding = self._generate_embedding(query)
+            if embedding is None:
+                return None
+            self._execute_write('''
+            INSERT OR REPLACE INTO query_embedding_cache (query_hash, embedding)
+            VALUES (?, ?)
+            ''', (query_hash, embedding))
+        
+        self._query_embeddings[query_hash] = embedding
+        if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_embeddings.popitem(last=False)
+        return embedding
+    
+    def _generate_embeddings(self, texts: List[str]) -> List[Optional[bytes]]:
+        """
+        Generate embeddings for many texts in batched forward passes.
+        
+        Args:
+            texts: Texts to generate embeddings for
+            
+        Returns:
+            One embedding (or None) per text, in order
+        """
+        if not self.embedding_model or not texts:
+            return [None] * len(texts)
+        
+        try:
+            embeddings = self.embedding_model.encode(
+                texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True,
+                normalize_embeddings=True, show_progress_bar=False
+            )
+            return [np.asarray(embedding, dtype=np.float32).tobytes() for embedding in embeddings]
+        except Exception as e:
+            self.logger.error(f"Error generating embeddings: {str(e)}")
+            return [None] * len(texts)
+    
+    @staticmethod
+    def _compute_similarity(embedding1: bytes, embedding2: bytes) -> float:
         """
         Compute cosine similarity between two embeddings.
         
         Args:
-            embedding1: First embedding
-            embedding2: Second embedding
+            embedding1: First embedding (unit length)
+            embedding2: Second embedding (unit length)
             
         Returns:
             Similarity score (0-1)
@@ -194,23 +540,450 @@ class RAGDatabase:
         if not EMBEDDINGS_AVAILABLE:
             return 0.0
         
+        vec1 = np.frombuffer(embedding1, dtype=np.float32)
+        vec2 = np.frombuffer(embedding2, dtype=np.float32)
+        if vec1.shape != vec2.shape:
+            return 0.0
+        
+        # Stored embeddings are normalized, so the dot product is the cosine
+        return float(vec1 @ vec2)
+    
+    def _get_embedding_index(self, table: str):
+        """
+        Get the in-memory search index over a table's embeddings.
+        
+        Args:
+            table: Table name
+            
+        Returns:
+            Tuple of (row id array, index) where index is a faiss.IndexFlatIP when faiss is
+            installed, otherwise (int8 codes, float32 row scales); index is None for an empty table
+        """
+        cached = self._embedding_indexes.get(table)
+        if cached is not None:
+            return cached
+        
+        ids, matrix = self._load_embeddings(table)
+        index = None
+        if len(ids):
+            if FAISS_AVAILABLE:
+                index = faiss.IndexFlatIP(matrix.shape[1])
+                index.add(matrix)
+            else:
+                index = self._quantize(matrix)
+        
+        self._embedding_indexes[table] = (ids, index)
+        return ids, index
+    
+    def _embedding_cache_paths(self, table: str, token: str, version: int) -> tuple:
+        """Get the (ids, matrix) .npy sidecar paths for a table's embeddings at a version of a database."""
+        base = f"{self.database_path}.{table}.{token}.v{version}"
+        return f"{base}.ids.npy", f"{base}.f32.npy"
+    
+    def _load_embeddings(self, table: str) -> tuple:
+        """
+        Load a table's embeddings, memory-mapped from the .npy sidecar when it matches the database.
+        
+        Args:
+            table: Table name
+            
+        Returns:
+            Tuple of (row id array, float32 matrix with one row per id)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT (SELECT token FROM database_identity), version
+        FROM embedding_versions WHERE table_name = ?
+        ''', (table,))
+        token, version = cursor.fetchone()
+        ids_path, matrix_path = self._embedding_cache_paths(table, token, version)
+        
+        if os.path.exists(ids_path) and os.path.exists(matrix_path):
+            try:
+                return np.load(ids_path), np.load(matrix_path, mmap_mode='r')
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable embedding cache for {table}: {str(e)}")
+        
+        cursor.execute(f"SELECT id, embedding FROM {table} WHERE embedding IS NOT NULL")
+        rows = cursor.fetchall()
+        
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        if not rows:
+            return ids, np.empty((0, 0), dtype=np.float32)
+        
+        matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        # Inside bulk() this sees uncommitted rows whose version may still roll back
+        if not self._in_bulk:
+            self._save_embedding_cache(table, token, version, ids, matrix)
+        return ids, matrix
+    
+    def _save_embedding_cache(self, table: str, token: str, version: int, ids, matrix) -> None:
+        """Write a table's embeddings to its .npy sidecar, replacing older versions."""
+        self._remove_embedding_caches(table)
         try:
-            vec1 = pickle.loads(embedding1)
-            vec2 = pickle.loads(embedding2)
+            for path, array in zip(self._embedding_cache_paths(table, token, version), (ids, matrix)):
+                with open(path + '.tmp', 'wb') as f:
+                    np.save(f, array)
+                os.replace(path + '.tmp', path)
+        except OSError as e:
+            self.logger.warning(f"Could not write embedding cache for {table}: {str(e)}")
+    
+    def _remove_embedding_caches(self, table: Optional[str] = None) -> None:
+        """Delete the .npy sidecars of a table (or all tables)."""
+        for name in ([table] if table else EMBEDDING_TABLES):
+            for path in glob.glob(glob.escape(f"{self.database_path}.{name}.") + "*.npy"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def _quantize(matrix):
+        """Quantize float32 rows to int8 codes with a per-row scale, so row ~= codes * scale."""
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(matrix / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    
+    def _execute_write(self, sql: str, params: Union[tuple, List[tuple]] = (), table: Optional[str] = None,
+                       many: bool = False, embedding: Optional[bytes] = None) -> int:
+        """
+        Run and commit a write under the database lock, then update the table's cached search state.
+        
+        Args:
+            sql: Statement to run
+            params: Statement parameters, or a list of them with many=True
+            table: Table whose cached embedding index and search results the write affects
+            many: Run the statement with executemany
+            embedding: Embedding of a row added by a plain INSERT, appended to the cached index
             
-            # Compute cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
+        Returns:
+            Row id of the last inserted row
+        """
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            try:
+                if many:
+                    cursor.executemany(sql, params)
+                else:
+                    cursor.execute(sql, params)
+                if not self._in_bulk:
+                    self.conn.commit()
+            except Exception:
+                # A failed statement is already undone; keep the rest of a bulk transaction
+                if not self._in_bulk:
+                    self.conn.rollback()
+                raise
+            
+            if table is not None:
+                if embedding is not None:
+                    self._append_embedding(table, cursor.lastrowid, embedding)
+                else:
+                    self._invalidate_embeddings(table)
+            return cursor.lastrowid
+    
+    @contextmanager
+    def bulk(self):
+        """
+        Run the writes made inside the block, e.g. several add_* calls, as one transaction.
+        
+        The transaction is committed once when the block exits, or rolled back if it raises.
+        Writes from other tasks made meanwhile join the same transaction.
+        """
+        if self._in_bulk:
+            yield
+            return
+        
+        with self._db_lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._in_bulk = True
+        
+        try:
+            yield
+        except BaseException:
+            with self._db_lock:
+                self._in_bulk = False
+                self.conn.rollback()
+                # Cached indexes and sidecars may hold rows that were rolled back
+                self._invalidate_embeddings()
+                self._remove_embedding_caches()
+            raise
+        
+        with self._db_lock:
+            self._in_bulk = False
+            self.conn.commit()
+            # Searches during the block could not see its rows, so drop what they cached
+            self._write_generation += 1
+            self._result_cache.clear()
+            self._lsh_buckets.clear()
+            self._embedded_tables.clear()
+    
+    def _fetch_all(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a query on the writer under the database lock, so rows written inside bulk() are included."""
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    
+    def _clear_query_embeddings(self) -> None:
+        """Drop every cached query embedding, on disk and in memory."""
+        with self._db_lock:
+            self._execute_write("DELETE FROM query_embedding_cache")
+            self._query_embeddings.clear()
+    
+    def _clear_search_history(self) -> int:
+        """Delete the search history and the query embeddings cached for it, returning the number of entries."""
+        with self._db_lock:
+            count = self._fetch_all("SELECT COUNT(*) FROM search_history")[0][0]
+            self._execute_write("DELETE FROM search_history")
+            self._clear_query_embeddings()
+            return count
+    
+    def _optimize(self) -> tuple:
+        """
+        Analyze, vacuum and reindex the database and merge FTS segments.
+        
+        Returns:
+            Tuple of (size before, size after) in bytes
+        """
+        with self._db_lock:
+            # VACUUM cannot run inside a transaction, and committing here would end the bulk() one early
+            if self._in_bulk:
+                raise RuntimeError("Cannot optimize the database inside bulk()")
+            if self.conn.in_transaction:
+                self.conn.commit()
             
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
+            start_size = os.path.getsize(self.database_path)
+            cursor = self.conn.cursor()
+            cursor.execute("ANALYZE")
+            cursor.execute("VACUUM")
+            cursor.execute("REINDEX")
             
-            return dot_product / (norm1 * norm2)
+            # Merge FTS index segments
+            if self._fts_available:
+                for table in FTS_COLUMNS:
+                    cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('optimize')")
+            self.conn.commit()
+            return start_size, os.path.getsize(self.database_path)
+    
+    def _invalidate_embeddings(self, table: Optional[str] = None) -> None:
+        """Drop cached search results and the embedding index for a table (or all tables) after a write."""
+        self._write_generation += 1
+        self._result_cache.clear()
+        self._lsh_buckets.clear()
+        if table is None:
+            self._embedding_indexes.clear()
+            self._embedded_tables.clear()
+        else:
+            self._embedding_indexes.pop(table, None)
+            self._embedded_tables.pop(table, None)
+    
+    def _append_embedding(self, table: str, row_id: int, embedding: Optional[bytes]) -> None:
+        """Add a newly inserted row to the cached index instead of reloading the table."""
+        self._write_generation += 1
+        self._result_cache.clear()
+        self._lsh_buckets.clear()
+        self._embedded_tables.pop(table, None)
+        cached = self._embedding_indexes.get(table)
+        if cached is None or embedding is None:
+            return
+        
+        ids, index = cached
+        vector = np.frombuffer(embedding, dtype=np.float32).reshape(1, -1)
+        
+        if isinstance(index, tuple) and index[0].shape[1] == vector.shape[1]:
+            codes, scales = self._quantize(vector)
+            index = (np.vstack([index[0], codes]), np.append(index[1], scales))
+        elif index is not None and not isinstance(index, tuple) and index.d == vector.shape[1]:
+            index.add(vector)
+        else:
+            # Empty table or a different embedding size; rebuild on the next search
+            self._invalidate_embeddings(table)
+            return
+        
+        self._embedding_indexes[table] = (np.append(ids, row_id), index)
+    
+    def _rescore(self, conn: sqlite3.Connection, table: str, row_ids, query) -> List[tuple]:
+        """
+        Score rows exactly against their stored float32 embeddings.
+        
+        Args:
+            conn: Read connection
+            table: Table name
+            row_ids: Row ids to score
+            query: Normalized query vector
             
-        except Exception as e:
-            self.logger.error(f"Error computing similarity: {str(e)}")
-            return 0.0
+        Returns:
+            List of (row id, similarity)
+        """
+        row_ids = [int(row_id) for row_id in row_ids]
+        if not row_ids:
+            return []
+        
+        # Incremental BLOB reads (Python 3.11+) skip statement preparation and row assembly
+        if hasattr(conn, 'blobopen'):
+            size = query.nbytes
+            vectors = np.empty((len(row_ids), len(query)), dtype=np.float32)
+            found = []
+            for row_id in row_ids:
+                try:
+                    with conn.blobopen(table, 'embedding', row_id, readonly=True) as blob:
+                        if len(blob) != size:
+                            continue
+                        vectors[len(found)] = np.frombuffer(blob.read(size), dtype=np.float32)
+                except sqlite3.OperationalError:
+                    # Row deleted since the index was built
+                    continue
+                found.append(row_id)
+            scores = vectors[:len(found)] @ query
+            return [(row_id, float(score)) for row_id, score in zip(found, scores)]
+        
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT id, embedding FROM {table}
+        WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(row_ids),))
+        
+        return [(row[0], float(np.frombuffer(row[1], dtype=np.float32) @ query)) for row in cursor.fetchall()]
+    
+    def _keyword_search(self, conn: sqlite3.Connection, table: str, query: str, limit: int) -> List[tuple]:
+        """
+        Find rows whose indexed columns contain every term of the query.
+        
+        For functions and hooks, a single-word query first matches names by prefix.
+        
+        Args:
+            conn: Read connection
+            table: Table name
+            query: Search query
+            limit: Maximum number of matches
+            
+        Returns:
+            List of (row id, relevance) with name matches first, then the best BM25 matches
+        """
+        terms = query.split()
+        if not terms or limit <= 0:
+            return []
+        
+        matches = []
+        name_column = NAME_COLUMNS.get(table)
+        if name_column and len(terms) == 1:
+            cursor = conn.cursor()
+            # Range scan on the NOCASE index; U+10FFFF sorts after any other character
+            cursor.execute(f'''
+            SELECT id FROM {table}
+            WHERE {name_column} >= ? COLLATE NOCASE AND {name_column} < ? COLLATE NOCASE
+            ORDER BY {name_column} COLLATE NOCASE
+            LIMIT ?
+            ''', (terms[0], terms[0] + '\U0010ffff', limit))
+            matches = [(row[0], 1.0) for row in cursor.fetchall()]
+            if len(matches) == limit:
+                return matches
+        
+        # Over-fetch so rows already matched by name do not use up the limit
+        found = {match[0] for match in matches}
+        for match in self._full_text_search(conn, table, query, terms, limit + len(matches)):
+            if match[0] not in found:
+                matches.append(match)
+        return matches[:limit]
+    
+    def _full_text_search(self, conn: sqlite3.Connection, table: str, query: str, terms: List[str],
+                          limit: int) -> List[tuple]:
+        """Match query terms against a table's FTS5 index, or LIKE scans without FTS5."""
+        cursor = conn.cursor()
+        
+        if not self._fts_available:
+            columns = FTS_COLUMNS[table]
+            cursor.execute(f'''
+            SELECT id FROM {table}
+            WHERE {' OR '.join(f"{column} LIKE ?" for column in columns)}
+            LIMIT ?
+            ''', (*[f'%{query}%'] * len(columns), limit))
+            return [(row[0], 1.0) for row in cursor.fetchall()]
+        
+        # Quote each term so FTS5 operators and punctuation are matched literally; prefix-match
+        # them so partial names still hit, as with the old LIKE scan
+        match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+        cursor.execute(f'''
+        SELECT rowid, bm25({table}_fts) FROM {table}_fts
+        WHERE {table}_fts MATCH ?
+        ORDER BY bm25({table}_fts)
+        LIMIT ?
+        ''', (match, limit))
+        
+        # bm25() is negative with lower being better; map it onto 0-1
+        return [(row[0], -row[1] / (1.0 - row[1])) for row in cursor.fetchall()]
+    
+    def _semantic_search(self, conn: sqlite3.Connection, table: str, query_embedding: bytes,
+                         exclude_ids: List[int], limit: int) -> List[tuple]:
+        """
+        Score every embedding in a table against the query.
+        
+        With faiss the exact inner-product index is searched directly. Otherwise every row is
+        scored from its int8 codes and the shortlist is rescored from the float32 embeddings.
+        
+        Args:
+            conn: Read connection
+            table: Table name
+            query_embedding: Query embedding
+            exclude_ids: Row ids already in the results
+            limit: Maximum number of matches
+            
+        Returns:
+            List of (row id, similarity) above SIMILARITY_THRESHOLD, best first
+        """
+        # The cached index is swapped or extended by writers, so score it under the lock
+        with self._db_lock:
+            ids, index = self._get_embedding_index(table)
+            if limit <= 0 or index is None:
+                return []
+            
+            query = np.frombuffer(query_embedding, dtype=np.float32)
+            
+            if not isinstance(index, tuple):
+                # Enough neighbours that excluded rows cannot push real matches out
+                k = min(len(ids), limit + len(exclude_ids))
+                scores, positions = index.search(query.reshape(1, -1), k)
+            
+                excluded = set(exclude_ids)
+                results = []
+                for score, position in zip(scores[0], positions[0]):
+                    if score <= SIMILARITY_THRESHOLD:
+                        break
+                    if position < 0:
+                        continue
+                    row_id = int(ids[position])
+                    if row_id in excluded:
+                        continue
+                    results.append((row_id, float(score)))
+                    if len(results) == limit:
+                        break
+                return results
+            
+            codes, scales = index
+            scores = np.empty(len(ids), dtype=np.float32)
+            if NUMBA_AVAILABLE:
+                _score_int8(codes, scales, query, scores)
+            else:
+                # Dequantize a block at a time so only the int8 codes stream from memory
+                for start in range(0, len(ids), SCORE_BLOCK_ROWS):
+                    block = codes[start:start + SCORE_BLOCK_ROWS]
+                    scores[start:start + len(block)] = block.astype(np.float32) @ query
+                scores *= scales
+            if exclude_ids:
+                scores[np.isin(ids, exclude_ids)] = -1.0
+            
+            # Shortlist in O(N) with argpartition, then rescore just those rows exactly
+            candidates = np.flatnonzero(scores > SIMILARITY_THRESHOLD - QUANTIZATION_MARGIN)
+            shortlist = limit * RERANK_FACTOR
+            if len(candidates) > shortlist:
+                candidates = candidates[np.argpartition(-scores[candidates], shortlist - 1)[:shortlist]]
+        
+        matches = [match for match in self._rescore(conn, table, ids[candidates], query) if match[1] > SIMILARITY_THRESHOLD]
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
     
     async def add_document(self, title: str, content: str, category: str, 
                           tags: Optional[List[str]] = None, source: Optional[str] = None) -> Dict[str, Any]:
@@ -228,10 +1001,8 @@ class RAGDatabase:
             Dict with operation status
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Generate embedding
-            embedding = self._generate_embedding(f"{title} {content}")
+            # Generate embedding off the event loop
+            embedding = await asyncio.to_thread(self._generate_embedding, f"{title} {content}")
             
             # Convert tags to string
             tags_str = None
@@ -239,13 +1010,10 @@ class RAGDatabase:
                 tags_str = ','.join(tags)
             
             # Insert document
-            cursor.execute('''
+            document_id = await asyncio.to_thread(self._execute_write, '''
             INSERT INTO documents (title, content, category, tags, source, embedding, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (title, content, category, tags_str, source, embedding))
-            
-            self.conn.commit()
-            document_id = cursor.lastrowid
+            ''', (title, content, category, tags_str, source, embedding), 'documents', embedding=embedding)
             
             console.print(f"[bold green]Added document: {title}[/bold green]")
             
@@ -265,6 +1033,49 @@ class RAGDatabase:
                 "message": error_msg
             }
     
+    async def add_documents_bulk(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Add many documents with one batched encode and one transaction.
+        
+        Args:
+            documents: Dicts with title, content and category, and optionally tags and source
+            
+        Returns:
+            Dict with operation status
+        """
+        try:
+            texts = [f"{doc['title']} {doc['content']}" for doc in documents]
+            embeddings = await asyncio.to_thread(self._generate_embeddings, texts)
+            
+            rows = []
+            for doc, embedding in zip(documents, embeddings):
+                tags = doc.get('tags')
+                rows.append((doc['title'], doc['content'], doc['category'],
+                             ','.join(tags) if tags else None, doc.get('source'), embedding))
+            
+            await asyncio.to_thread(self._execute_write, '''
+            INSERT INTO documents (title, content, category, tags, source, embedding, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', rows, 'documents', many=True)
+            
+            console.print(f"[bold green]Added {len(rows)} documents[/bold green]")
+            
+            return {
+                "status": "success",
+                "message": f"Added {len(rows)} documents",
+                "documents_added": len(rows)
+            }
+            
+        except Exception as e:
+            error_msg = f"Error adding documents: {str(e)}"
+            self.logger.error(error_msg)
+            console.print(f"[bold red]Error:[/bold red] {error_msg}")
+            
+            return {
+                "status": "error",
+                "message": error_msg
+            }
+    
     async def add_code_snippet(self, title: str, code: str, language: str, 
                               description: Optional[str] = None, tags: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -281,11 +1092,9 @@ class RAGDatabase:
             Dict with operation status
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Generate embedding
+            # Generate embedding off the event loop
             embedding_text = f"{title} {description or ''} {code}"
-            embedding = self._generate_embedding(embedding_text)
+            embedding = await asyncio.to_thread(self._generate_embedding, embedding_text)
             
             # Convert tags to string
             tags_str = None
@@ -293,13 +1102,10 @@ class RAGDatabase:
                 tags_str = ','.join(tags)
             
             # Insert code snippet
-            cursor.execute('''
+            snippet_id = await asyncio.to_thread(self._execute_write, '''
             INSERT INTO code_snippets (title, code, language, description, tags, embedding, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (title, code, language, description, tags_str, embedding))
-            
-            self.conn.commit()
-            snippet_id = cursor.lastrowid
+            ''', (title, code, language, description, tags_str, embedding), 'code_snippets', embedding=embedding)
             
             console.print(f"[bold green]Added code snippet: {title}[/bold green]")
             
@@ -341,28 +1147,23 @@ class RAGDatabase:
             Dict with operation status
         """
         try:
-            cursor = self.conn.cursor()
-            
             # Convert parameters to JSON string
             parameters_json = None
             if parameters:
                 parameters_json = json.dumps(parameters)
             
-            # Generate embedding
+            # Generate embedding off the event loop
             embedding_text = f"{function_name} {signature} {description or ''}"
-            embedding = self._generate_embedding(embedding_text)
+            embedding = await asyncio.to_thread(self._generate_embedding, embedding_text)
             
-            # Insert function
-            cursor.execute('''
+            # Insert function; a replaced row drops the cached index
+            function_id = await asyncio.to_thread(self._execute_write, '''
             INSERT OR REPLACE INTO wp_functions 
             (function_name, signature, description, parameters, return_value, example, 
              version_added, deprecated, source_file, embedding, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
             ''', (function_name, signature, description, parameters_json, return_value, 
-                  example, version_added, deprecated, source_file, embedding))
-            
-            self.conn.commit()
-            function_id = cursor.lastrowid
+                  example, version_added, deprecated, source_file, embedding), 'wp_functions')
             
             console.print(f"[bold green]Added WordPress function: {function_name}[/bold green]")
             
@@ -401,28 +1202,23 @@ class RAGDatabase:
             Dict with operation status
         """
         try:
-            cursor = self.conn.cursor()
-            
             # Convert parameters to JSON string
             parameters_json = None
             if parameters:
                 parameters_json = json.dumps(parameters)
             
-            # Generate embedding
+            # Generate embedding off the event loop
             embedding_text = f"{hook_name} {hook_type} {description or ''}"
-            embedding = self._generate_embedding(embedding_text)
+            embedding = await asyncio.to_thread(self._generate_embedding, embedding_text)
             
-            # Insert hook
-            cursor.execute('''
+            # Insert hook; a replaced row drops the cached index
+            hook_id = await asyncio.to_thread(self._execute_write, '''
             INSERT OR REPLACE INTO wp_hooks 
             (hook_name, hook_type, description, parameters, source_file, example, 
              version_added, embedding, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
             ''', (hook_name, hook_type, description, parameters_json, source_file, 
-                  example, version_added, embedding))
-            
-            self.conn.commit()
-            hook_id = cursor.lastrowid
+                  example, version_added, embedding), 'wp_hooks')
             
             console.print(f"[bold green]Added WordPress hook: {hook_name}[/bold green]")
             
@@ -458,51 +1254,36 @@ class RAGDatabase:
         """
         try:
             # Record search in history
-            cursor = self.conn.cursor()
-            cursor.execute('''
+            search_id = await asyncio.to_thread(self._execute_write, '''
             INSERT INTO search_history (query, result_count)
             VALUES (?, 0)
             ''', (query,))
-            self.conn.commit()
-            search_id = cursor.lastrowid
             
             # Default to all categories if none specified
             if not categories:
                 categories = ['documents', 'code_snippets', 'wp_functions', 'wp_hooks']
             
-            results = {}
-            total_results = 0
+            query_hash = hashlib.blake2b(query.encode('utf-8'), digest_size=16,
+                                         person=self._embedding_backend.encode()).digest()
+            use_semantic = bool(use_semantic and self.embedding_model)
+            cache_key = (query_hash, tuple(categories), limit, use_semantic)
             
-            # Generate query embedding for semantic search
-            query_embedding = None
-            if use_semantic and self.embedding_model:
-                query_embedding = self._generate_embedding(query)
-            
-            # Search in each category
-            for category in categories:
-                if category == 'documents':
-                    results['documents'] = await self._search_documents(query, query_embedding, limit)
-                    total_results += len(results['documents'])
-                
-                elif category == 'code_snippets':
-                    results['code_snippets'] = await self._search_code_snippets(query, query_embedding, limit)
-                    total_results += len(results['code_snippets'])
-                
-                elif category == 'wp_functions':
-                    results['wp_functions'] = await self._search_wp_functions(query, query_embedding, limit)
-                    total_results += len(results['wp_functions'])
-                
-                elif category == 'wp_hooks':
-                    results['wp_hooks'] = await self._search_wp_hooks(query, query_embedding, limit)
-                    total_results += len(results['wp_hooks'])
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                results, total_results = cached[0], cached[1]
+            else:
+                # Match, encode and score off the event loop
+                results, total_results = await asyncio.to_thread(
+                    self._search_categories, query, query_hash, use_semantic, categories, limit, cache_key
+                )
             
             # Update search history with result count
-            cursor.execute('''
+            await asyncio.to_thread(self._execute_write, '''
             UPDATE search_history
             SET result_count = ?
             WHERE id = ?
             ''', (total_results, search_id))
-            self.conn.commit()
             
             # Display results summary
             console.print(f"[bold green]Found {total_results} results for query: {query}[/bold green]")
@@ -525,180 +1306,272 @@ class RAGDatabase:
                 "message": error_msg
             }
     
-    async def _search_documents(self, query: str, query_embedding: Optional[bytes], limit: int) -> List[Dict[str, Any]]:
+    def _search_categories(self, query: str, query_hash: bytes, use_semantic: bool, categories: List[str],
+                           limit: int, cache_key: tuple) -> tuple:
         """
-        Search for documents matching the query.
+        Search each category on a pooled read connection and cache the combined results.
+        
+        Keyword matches are found first; the query is only encoded when some category still has
+        slots to fill and rows with embeddings to fill them from.
         
         Args:
             query: Search query
+            query_hash: blake2b digest of the query, personalized with the embedding backend
+            use_semantic: Whether to fill remaining slots with semantic matches
+            categories: Categories to search in
+            limit: Maximum number of results per category
+            cache_key: Result cache key for this search
+            
+        Returns:
+            Tuple of (results by category, total result count)
+        """
+        generation = self._write_generation
+        results = {}
+        total_results = 0
+        
+        conn = self._read_pool.get()
+        try:
+            keyword_matches = {category: self._keyword_search(conn, category, query, limit)
+                               for category in categories if category in EMBEDDING_TABLES}
+            # Only the semantic part carries over between near-identical queries
+            keyword_key = tuple((category, tuple(matches)) for category, matches in keyword_matches.items())
+            
+            query_embedding = None
+            if use_semantic and any(len(matches) < limit and self._has_embeddings(conn, category)
+                                    for category, matches in keyword_matches.items()):
+                query_embedding = self._query_embedding(query, query_hash)
+                
+                # A near-identical earlier question can answer this one
+                if query_embedding:
+                    with self._db_lock:
+                        similar = self._find_similar_search(query_embedding, categories, limit, keyword_key)
+                    if similar is not None:
+                        return similar
+            
+            # Search in each category
+            for category in categories:
+                if category == 'documents':
+                    results['documents'] = self._search_documents(conn, keyword_matches['documents'], query_embedding, limit)
+                    total_results += len(results['documents'])
+                
+                elif category == 'code_snippets':
+                    results['code_snippets'] = self._search_code_snippets(conn, keyword_matches['code_snippets'], query_embedding, limit)
+                    total_results += len(results['code_snippets'])
+                
+                elif category == 'wp_functions':
+                    results['wp_functions'] = self._search_wp_functions(conn, keyword_matches['wp_functions'], query_embedding, limit)
+                    total_results += len(results['wp_functions'])
+                
+                elif category == 'wp_hooks':
+                    results['wp_hooks'] = self._search_wp_hooks(conn, keyword_matches['wp_hooks'], query_embedding, limit)
+                    total_results += len(results['wp_hooks'])
+        finally:
+            self._read_pool.put(conn)
+        
+        with self._db_lock:
+            # A write that landed mid-search may not be reflected, so leave those results uncached
+            if self._write_generation != generation:
+                return results, total_results
+            
+            query_vector = None
+            if query_embedding:
+                query_vector = np.frombuffer(query_embedding, dtype=np.float32)
+                bucket_key = (self._lsh_bucket(query_vector), tuple(categories), limit)
+                # Drop keys the LRU has already evicted
+                keys = [key for key in self._lsh_buckets.get(bucket_key, ()) if key in self._result_cache]
+                keys.append(cache_key)
+                self._lsh_buckets[bucket_key] = keys
+            
+            self._result_cache[cache_key] = (results, total_results, query_vector, keyword_key)
+            if len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+            return results, total_results
+    
+    def _has_embeddings(self, conn: sqlite3.Connection, table: str) -> bool:
+        """Check whether any row of a table has an embedding, remembering the answer until the next write."""
+        has_embeddings = self._embedded_tables.get(table)
+        if has_embeddings is None:
+            generation = self._write_generation
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT EXISTS(SELECT 1 FROM {table} WHERE embedding IS NOT NULL)")
+            has_embeddings = bool(cursor.fetchone()[0])
+            if self._write_generation == generation:
+                self._embedded_tables[table] = has_embeddings
+        return has_embeddings
+    
+    def _lsh_bucket(self, vector) -> int:
+        """Hash a query embedding to the sign pattern of its projections onto LSH_HYPERPLANES hyperplanes."""
+        if self._lsh_planes is None or self._lsh_planes.shape[1] != len(vector):
+            # Fixed seed keeps bucket assignment stable for the lifetime of the process
+            rng = np.random.default_rng(0)
+            self._lsh_planes = rng.standard_normal((LSH_HYPERPLANES, len(vector))).astype(np.float32)
+            self._lsh_buckets.clear()
+        
+        bits = (self._lsh_planes @ vector) > 0
+        return int(bits.dot(1 << np.arange(LSH_HYPERPLANES)))
+    
+    def _find_similar_search(self, query_embedding: bytes, categories: List[str], limit: int,
+                             keyword_key: tuple) -> Optional[tuple]:
+        """
+        Find cached results of an earlier semantic search for a near-identical query.
+        
+        The earlier results are only reused when its keyword matches were the same as this
+        query's, so they differ at most in semantic matches that are near-identical too.
+        
+        Args:
+            query_embedding: Query embedding
+            categories: Categories searched
+            limit: Maximum number of results per category
+            keyword_key: This query's keyword matches as ((category, matches), ...)
+            
+        Returns:
+            Tuple of (results by category, total result count) or None
+        """
+        query = np.frombuffer(query_embedding, dtype=np.float32)
+        bucket_key = (self._lsh_bucket(query), tuple(categories), limit)
+        
+        for cache_key in self._lsh_buckets.get(bucket_key, ()):
+            cached = self._result_cache.get(cache_key)
+            if (cached is not None and cached[3] == keyword_key
+                    and float(cached[2] @ query) >= SEMANTIC_CACHE_THRESHOLD):
+                self._result_cache.move_to_end(cache_key)
+                return cached[0], cached[1]
+        return None
+    
+    def _search_documents(self, conn: sqlite3.Connection, matches: List[tuple], query_embedding: Optional[bytes],
+                          limit: int) -> List[Dict[str, Any]]:
+        """
+        Search for documents matching the query.
+        
+        Args:
+            conn: Read connection
+            matches: Keyword matches as (row id, relevance)
             query_embedding: Query embedding for semantic search
             limit: Maximum number of results
             
         Returns:
             List of matching documents
         """
-        cursor = self.conn.cursor()
-        results = []
+        # Semantic matches fill the slots keyword matches left
+        if query_embedding and len(matches) < limit:
+            existing_ids = [match[0] for match in matches]
+            matches = matches + self._semantic_search(conn, 'documents', query_embedding, existing_ids, limit - len(matches))
+        
+        if not matches:
+            return []
         
-        # First try keyword search
+        cursor = conn.cursor()
+        match_ids = [match[0] for match in matches]
         cursor.execute('''
-        SELECT id, title, content, category, tags, source, embedding
+        SELECT id, title, content, category, tags, source
         FROM documents
-        WHERE title LIKE ? OR content LIKE ?
-        LIMIT ?
-        ''', (f'%{query}%', f'%{query}%', limit))
+        WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(match_ids),))
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
         
-        rows = cursor.fetchall()
-        
-        for row in rows:
-            doc = {
+        results = []
+        for doc_id, relevance in matches:
+            row = rows_by_id.get(doc_id)
+            if row is None:
+                continue
+            results.append({
                 "id": row[0],
                 "title": row[1],
                 "content": row[2],
                 "category": row[3],
                 "tags": row[4].split(',') if row[4] else [],
                 "source": row[5],
-                "relevance": 1.0  # Default relevance for keyword match
-            }
-            results.append(doc)
-        
-        # If semantic search is enabled and we have embeddings
-        if query_embedding and len(results) < limit:
-            # Get all documents not already in results
-            existing_ids = [doc["id"] for doc in results]
-            id_exclusion = f"AND id NOT IN ({','.join('?' for _ in existing_ids)})" if existing_ids else ""
-            
-            cursor.execute(f'''
-            SELECT id, title, content, category, tags, source, embedding
-            FROM documents
-            WHERE embedding IS NOT NULL {id_exclusion}
-            ''', existing_ids)
-            
-            semantic_candidates = cursor.fetchall()
-            semantic_results = []
-            
-            for row in semantic_candidates:
-                if row[6]:  # If embedding exists
-                    similarity = self._compute_similarity(query_embedding, row[6])
-                    if similarity > 0.7:  # Threshold for semantic similarity
-                        doc = {
-                            "id": row[0],
-                            "title": row[1],
-                            "content": row[2],
-                            "category": row[3],
-                            "tags": row[4].split(',') if row[4] else [],
-                            "source": row[5],
-                            "relevance": similarity
-                        }
-                        semantic_results.append(doc)
-            
-            # Sort by relevance and add to results
-            semantic_results.sort(key=lambda x: x["relevance"], reverse=True)
-            results.extend(semantic_results[:limit - len(results)])
+                "relevance": relevance
+            })
         
         return results
     
-    async def _search_code_snippets(self, query: str, query_embedding: Optional[bytes], limit: int) -> List[Dict[str, Any]]:
+    def _search_code_snippets(self, conn: sqlite3.Connection, matches: List[tuple], query_embedding: Optional[bytes],
+                              limit: int) -> List[Dict[str, Any]]:
         """
         Search for code snippets matching the query.
         
         Args:
-            query: Search query
+            conn: Read connection
+            matches: Keyword matches as (row id, relevance)
             query_embedding: Query embedding for semantic search
             limit: Maximum number of results
             
         Returns:
             List of matching code snippets
         """
-        cursor = self.conn.cursor()
-        results = []
+        # Semantic matches fill the slots keyword matches left
+        if query_embedding and len(matches) < limit:
+            existing_ids = [match[0] for match in matches]
+            matches = matches + self._semantic_search(conn, 'code_snippets', query_embedding, existing_ids, limit - len(matches))
         
-        # First try keyword search
+        if not matches:
+            return []
+        
+        cursor = conn.cursor()
+        match_ids = [match[0] for match in matches]
         cursor.execute('''
-        SELECT id, title, code, language, description, tags, embedding
+        SELECT id, title, code, language, description, tags
         FROM code_snippets
-        WHERE title LIKE ? OR code LIKE ? OR description LIKE ?
-        LIMIT ?
-        ''', (f'%{query}%', f'%{query}%', f'%{query}%', limit))
-        
-        rows = cursor.fetchall()
+        WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(match_ids),))
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
         
-        for row in rows:
-            snippet = {
+        results = []
+        for snippet_id, relevance in matches:
+            row = rows_by_id.get(snippet_id)
+            if row is None:
+                continue
+            results.append({
                 "id": row[0],
                 "title": row[1],
                 "code": row[2],
                 "language": row[3],
                 "description": row[4],
                 "tags": row[5].split(',') if row[5] else [],
-                "relevance": 1.0  # Default relevance for keyword match
-            }
-            results.append(snippet)
-        
-        # If semantic search is enabled and we have embeddings
-        if query_embedding and len(results) < limit:
-            # Get all snippets not already in results
-            existing_ids = [snippet["id"] for snippet in results]
-            id_exclusion = f"AND id NOT IN ({','.join('?' for _ in existing_ids)})" if existing_ids else ""
-            
-            cursor.execute(f'''
-            SELECT id, title, code, language, description, tags, embedding
-            FROM code_snippets
-            WHERE embedding IS NOT NULL {id_exclusion}
-            ''', existing_ids)
-            
-            semantic_candidates = cursor.fetchall()
-            semantic_results = []
-            
-            for row in semantic_candidates:
-                if row[6]:  # If embedding exists
-                    similarity = self._compute_similarity(query_embedding, row[6])
-                    if similarity > 0.7:  # Threshold for semantic similarity
-                        snippet = {
-                            "id": row[0],
-                            "title": row[1],
-                            "code": row[2],
-                            "language": row[3],
-                            "description": row[4],
-                            "tags": row[5].split(',') if row[5] else [],
-                            "relevance": similarity
-                        }
-                        semantic_results.append(snippet)
-            
-            # Sort by relevance and add to results
-            semantic_results.sort(key=lambda x: x["relevance"], reverse=True)
-            results.extend(semantic_results[:limit - len(results)])
+                "relevance": relevance
+            })
         
         return results
     
-    async def _search_wp_functions(self, query: str, query_embedding: Optional[bytes], limit: int) -> List[Dict[str, Any]]:
+    def _search_wp_functions(self, conn: sqlite3.Connection, matches: List[tuple], query_embedding: Optional[bytes],
+                             limit: int) -> List[Dict[str, Any]]:
         """
         Search for WordPress functions matching the query.
         
         Args:
-            query: Search query
+            conn: Read connection
+            matches: Keyword matches as (row id, relevance)
             query_embedding: Query embedding for semantic search
             limit: Maximum number of results
             
         Returns:
             List of matching WordPress functions
         """
-        cursor = self.conn.cursor()
-        results = []
+        # Semantic matches fill the slots keyword matches left
+        if query_embedding and len(matches) < limit:
+            existing_ids = [match[0] for match in matches]
+            matches = matches + self._semantic_search(conn, 'wp_functions', query_embedding, existing_ids, limit - len(matches))
         
-        # First try keyword search
+        if not matches:
+            return []
+        
+        cursor = conn.cursor()
+        match_ids = [match[0] for match in matches]
         cursor.execute('''
         SELECT id, function_name, signature, description, parameters, return_value, 
-               example, version_added, deprecated, source_file, embedding
+               example, version_added, deprecated, source_file
         FROM wp_functions
-        WHERE function_name LIKE ? OR signature LIKE ? OR description LIKE ?
-        LIMIT ?
-        ''', (f'%{query}%', f'%{query}%', f'%{query}%', limit))
-        
-        rows = cursor.fetchall()
+        WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(match_ids),))
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
         
-        for row in rows:
-            func = {
+        results = []
+        for func_id, relevance in matches:
+            row = rows_by_id.get(func_id)
+            if row is None:
+                continue
+            results.append({
                 "id": row[0],
                 "function_name": row[1],
                 "signature": row[2],
@@ -709,79 +1582,49 @@ class RAGDatabase:
                 "version_added": row[7],
                 "deprecated": bool(row[8]),
                 "source_file": row[9],
-                "relevance": 1.0  # Default relevance for keyword match
-            }
-            results.append(func)
-        
-        # If semantic search is enabled and we have embeddings
-        if query_embedding and len(results) < limit:
-            # Get all functions not already in results
-            existing_ids = [func["id"] for func in results]
-            id_exclusion = f"AND id NOT IN ({','.join('?' for _ in existing_ids)})" if existing_ids else ""
-            
-            cursor.execute(f'''
-            SELECT id, function_name, signature, description, parameters, return_value, 
-                   example, version_added, deprecated, source_file, embedding
-            FROM wp_functions
-            WHERE embedding IS NOT NULL {id_exclusion}
-            ''', existing_ids)
-            
-            semantic_candidates = cursor.fetchall()
-            semantic_results = []
-            
-            for row in semantic_candidates:
-                if row[10]:  # If embedding exists
-                    similarity = self._compute_similarity(query_embedding, row[10])
-                    if similarity > 0.7:  # Threshold for semantic similarity
-                        func = {
-                            "id": row[0],
-                            "function_name": row[1],
-                            "signature": row[2],
-                            "description": row[3],
-                            "parameters": json.loads(row[4]) if row[4] else {},
-                            "return_value": row[5],
-                            "example": row[6],
-                            "version_added": row[7],
-                            "deprecated": bool(row[8]),
-                            "source_file": row[9],
-                            "relevance": similarity
-                        }
-                        semantic_results.append(func)
-            
-            # Sort by relevance and add to results
-            semantic_results.sort(key=lambda x: x["relevance"], reverse=True)
-            results.extend(semantic_results[:limit - len(results)])
+                "relevance": relevance
+            })
         
         return results
     
-    async def _search_wp_hooks(self, query: str, query_embedding: Optional[bytes], limit: int) -> List[Dict[str, Any]]:
+    def _search_wp_hooks(self, conn: sqlite3.Connection, matches: List[tuple], query_embedding: Optional[bytes],
+                         limit: int) -> List[Dict[str, Any]]:
         """
         Search for WordPress hooks matching the query.
         
         Args:
-            query: Search query
+            conn: Read connection
+            matches: Keyword matches as (row id, relevance)
             query_embedding: Query embedding for semantic search
             limit: Maximum number of results
             
         Returns:
             List of matching WordPress hooks
         """
-        cursor = self.conn.cursor()
-        results = []
+        # Semantic matches fill the slots keyword matches left
+        if query_embedding and len(matches) < limit:
+            existing_ids = [match[0] for match in matches]
+            matches = matches + self._semantic_search(conn, 'wp_hooks', query_embedding, existing_ids, limit - len(matches))
+        
+        if not matches:
+            return []
         
-        # First try keyword search
+        cursor = conn.cursor()
+        match_ids = [match[0] for match in matches]
         cursor.execute('''
         SELECT id, hook_name, hook_type, description, parameters, source_file, 
-               example, version_added, embedding
+               example, version_added
         FROM wp_hooks
-        WHERE hook_name LIKE ? OR description LIKE ?
-        LIMIT ?
-        ''', (f'%{query}%', f'%{query}%', limit))
-        
-        rows = cursor.fetchall()
+        WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(match_ids),))
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
         
-        for row in rows:
-            hook = {
+        results = []
+        for hook_id, relevance in matches:
+            row = rows_by_id.get(hook_id)
+            if row is None:
+                continue
+            results.append({
                 "id": row[0],
                 "hook_name": row[1],
                 "hook_type": row[2],
@@ -790,46 +1633,8 @@ class RAGDatabase:
                 "source_file": row[5],
                 "example": row[6],
                 "version_added": row[7],
-                "relevance": 1.0  # Default relevance for keyword match
-            }
-            results.append(hook)
-        
-        # If semantic search is enabled and we have embeddings
-        if query_embedding and len(results) < limit:
-            # Get all hooks not already in results
-            existing_ids = [hook["id"] for hook in results]
-            id_exclusion = f"AND id NOT IN ({','.join('?' for _ in existing_ids)})" if existing_ids else ""
-            
-            cursor.execute(f'''
-            SELECT id, hook_name, hook_type, description, parameters, source_file, 
-                   example, version_added, embedding
-            FROM wp_hooks
-            WHERE embedding IS NOT NULL {id_exclusion}
-            ''', existing_ids)
-            
-            semantic_candidates = cursor.fetchall()
-            semantic_results = []
-            
-            for row in semantic_candidates:
-                if row[8]:  # If embedding exists
-                    similarity = self._compute_similarity(query_embedding, row[8])
-                    if similarity > 0.7:  # Threshold for semantic similarity
-                        hook = {
-                            "id": row[0],
-                            "hook_name": row[1],
-                            "hook_type": row[2],
-                            "description": row[3],
-                            "parameters": json.loads(row[4]) if row[4] else {},
-                            "source_file": row[5],
-                            "example": row[6],
-                            "version_added": row[7],
-                            "relevance": similarity
-                        }
-                        semantic_results.append(hook)
-            
-            # Sort by relevance and add to results
-            semantic_results.sort(key=lambda x: x["relevance"], reverse=True)
-            results.extend(semantic_results[:limit - len(results)])
+                "relevance": relevance
+            })
         
         return results
     
@@ -1104,62 +1909,65 @@ class RAGDatabase:
                 "errors": []
             }
             
-            # Process function documentation
-            functions_path = os.path.join(docs_path, "functions")
-            if os.path.exists(functions_path):
-                for file_name in os.listdir(functions_path):
-                    if file_name.endswith(".json"):
-                        try:
-                            with open(os.path.join(functions_path, file_name), 'r', encoding='utf-8') as f:
-                                func_data = json.load(f)
-                                
-                                # Add function to database
-                                await self.add_wp_function(
-                                    function_name=func_data.get("function_name"),
-                                    signature=func_data.get("signature"),
-                                    description=func_data.get("description"),
-                                    parameters=func_data.get("parameters"),
-                                    return_value=func_data.get("return_value"),
-                                    example=func_data.get("example"),
-                                    version_added=func_data.get("version_added"),
-                                    deprecated=func_data.get("deprecated", False),
-                                    source_file=func_data.get("source_file")
-                                )
-                                stats["functions_added"] += 1
-                                
-                        except Exception as e:
-                            error_msg = f"Error importing function from {file_name}: {str(e)}"
-                            self.logger.error(error_msg)
-                            stats["errors"].append(error_msg)
-            
-            # Process hook documentation
-            hooks_path = os.path.join(docs_path, "hooks")
-            if os.path.exists(hooks_path):
-                for file_name in os.listdir(hooks_path):
-                    if file_name.endswith(".json"):
-                        try:
-                            with open(os.path.join(hooks_path, file_name), 'r', encoding='utf-8') as f:
-                                hook_data = json.load(f)
-                                
-                                # Add hook to database
-                                await self.add_wp_hook(
-                                    hook_name=hook_data.get("hook_name"),
-                                    hook_type=hook_data.get("hook_type"),
-                                    description=hook_data.get("description"),
-                                    parameters=hook_data.get("parameters"),
-                                    source_file=hook_data.get("source_file"),
-                                    example=hook_data.get("example"),
-                                    version_added=hook_data.get("version_added")
-                                )
-                                stats["hooks_added"] += 1
-                                
-                        except Exception as e:
-                            error_msg = f"Error importing hook from {file_name}: {str(e)}"
-                            self.logger.error(error_msg)
-                            stats["errors"].append(error_msg)
+            # Functions and hooks are added one at a time; commit them together
+            with self.bulk():
+                # Process function documentation
+                functions_path = os.path.join(docs_path, "functions")
+                if os.path.exists(functions_path):
+                    for file_name in os.listdir(functions_path):
+                        if file_name.endswith(".json"):
+                            try:
+                                with open(os.path.join(functions_path, file_name), 'r', encoding='utf-8') as f:
+                                    func_data = json.load(f)
+                                    
+                                    # Add function to database
+                                    await self.add_wp_function(
+                                        function_name=func_data.get("function_name"),
+                                        signature=func_data.get("signature"),
+                                        description=func_data.get("description"),
+                                        parameters=func_data.get("parameters"),
+                                        return_value=func_data.get("return_value"),
+                                        example=func_data.get("example"),
+                                        version_added=func_data.get("version_added"),
+                                        deprecated=func_data.get("deprecated", False),
+                                        source_file=func_data.get("source_file")
+                                    )
+                                    stats["functions_added"] += 1
+                                    
+                            except Exception as e:
+                                error_msg = f"Error importing function from {file_name}: {str(e)}"
+                                self.logger.error(error_msg)
+                                stats["errors"].append(error_msg)
+                
+                # Process hook documentation
+                hooks_path = os.path.join(docs_path, "hooks")
+                if os.path.exists(hooks_path):
+                    for file_name in os.listdir(hooks_path):
+                        if file_name.endswith(".json"):
+                            try:
+                                with open(os.path.join(hooks_path, file_name), 'r', encoding='utf-8') as f:
+                                    hook_data = json.load(f)
+                                    
+                                    # Add hook to database
+                                    await self.add_wp_hook(
+                                        hook_name=hook_data.get("hook_name"),
+                                        hook_type=hook_data.get("hook_type"),
+                                        description=hook_data.get("description"),
+                                        parameters=hook_data.get("parameters"),
+                                        source_file=hook_data.get("source_file"),
+                                        example=hook_data.get("example"),
+                                        version_added=hook_data.get("version_added")
+                                    )
+                                    stats["hooks_added"] += 1
+                                    
+                            except Exception as e:
+                                error_msg = f"Error importing hook from {file_name}: {str(e)}"
+                                self.logger.error(error_msg)
+                                stats["errors"].append(error_msg)
             
             # Process markdown documentation
             docs_content_path = os.path.join(docs_path, "content")
+            documents = []
             if os.path.exists(docs_content_path):
                 for root, _, files in os.walk(docs_content_path):
                     for file_name in files:
@@ -1178,20 +1986,26 @@ class RAGDatabase:
                                 rel_path = os.path.relpath(root, docs_content_path)
                                 category = rel_path.replace("\\", "/").split("/")[0] if rel_path != "." else "general"
                                 
-                                # Add document to database
-                                await self.add_document(
-                                    title=title,
-                                    content=content,
-                                    category=category,
-                                    source=file_path
-                                )
-                                stats["documents_added"] += 1
+                                documents.append({
+                                    "title": title,
+                                    "content": content,
+                                    "category": category,
+                                    "source": file_path
+                                })
                                 
                             except Exception as e:
                                 error_msg = f"Error importing document from {file_name}: {str(e)}"
                                 self.logger.error(error_msg)
                                 stats["errors"].append(error_msg)
             
+            # Add all documents in one batch
+            if documents:
+                result = await self.add_documents_bulk(documents)
+                if result["status"] == "success":
+                    stats["documents_added"] = result["documents_added"]
+                else:
+                    stats["errors"].append(result["message"])
+            
             # Display import summary
             console.print(f"[bold green]Import completed:[/bold green]")
             console.print(f"- Functions added: {stats['functions_added']}")
@@ -1521,23 +2335,8 @@ class RAGDatabase:
         """
         try:
             start_time = time.time()
-            start_size = os.path.getsize(self.database_path)
-            
-            cursor = self.conn.cursor()
-            
-            # Analyze tables
-            cursor.execute("ANALYZE")
-            
-            # Vacuum database
-            cursor.execute("VACUUM")
-            
-            # Rebuild indexes
-            cursor.execute("REINDEX")
-            
-            self.conn.commit()
-            
+            start_size, end_size = await asyncio.to_thread(self._optimize)
             end_time = time.time()
-            end_size = os.path.getsize(self.database_path)
             
             size_diff = start_size - end_size
             time_taken = round(end_time - start_time, 2)
@@ -1590,101 +2389,42 @@ class RAGDatabase:
                 "errors": []
             }
             
-            cursor = self.conn.cursor()
-            
-            # Update document embeddings
-            cursor.execute("SELECT id, title, content FROM documents")
-            documents = cursor.fetchall()
-            
-            for doc in documents:
-                try:
-                    doc_id, title, content = doc
-                    embedding_text = f"{title} {content}"
-                    embedding = self._generate_embedding(embedding_text)
-                    
-                    cursor.execute('''
-                    UPDATE documents
-                    SET embedding = ?
-                    WHERE id = ?
-                    ''', (embedding, doc_id))
-                    
-                    stats["documents_updated"] += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error updating embedding for document {doc[0]}: {str(e)}"
-                    self.logger.error(error_msg)
-                    stats["errors"].append(error_msg)
-            
-            # Update code snippet embeddings
-            cursor.execute("SELECT id, title, code, description FROM code_snippets")
-            snippets = cursor.fetchall()
-            
-            for snippet in snippets:
-                try:
-                    snippet_id, title, code, description = snippet
-                    embedding_text = f"{title} {description or ''} {code}"
-                    embedding = self._generate_embedding(embedding_text)
-                    
-                    cursor.execute('''
-                    UPDATE code_snippets
-                    SET embedding = ?
-                    WHERE id = ?
-                    ''', (embedding, snippet_id))
-                    
-                    stats["code_snippets_updated"] += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error updating embedding for code snippet {snippet[0]}: {str(e)}"
-                    self.logger.error(error_msg)
-                    stats["errors"].append(error_msg)
-            
-            # Update WordPress function embeddings
-            cursor.execute("SELECT id, function_name, signature, description FROM wp_functions")
-            functions = cursor.fetchall()
-            
-            for func in functions:
-                try:
-                    func_id, function_name, signature, description = func
-                    embedding_text = f"{function_name} {signature or ''} {description or ''}"
-                    embedding = self._generate_embedding(embedding_text)
-                    
-                    cursor.execute('''
-                    UPDATE wp_functions
-                    SET embedding = ?
-                    WHERE id = ?
-                    ''', (embedding, func_id))
-                    
-                    stats["wp_functions_updated"] += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error updating embedding for WordPress function {func[0]}: {str(e)}"
-                    self.logger.error(error_msg)
-                    stats["errors"].append(error_msg)
-            
-            # Update WordPress hook embeddings
-            cursor.execute("SELECT id, hook_name, hook_type, description FROM wp_hooks")
-            hooks = cursor.fetchall()
+            # (table, row query, text builder, label) for each table with embeddings
+            sources = (
+                ('documents', "SELECT id, title, content FROM documents",
+                 lambda title, content: f"{title} {content}", "documents"),
+                ('code_snippets', "SELECT id, title, code, description FROM code_snippets",
+                 lambda title, code, description: f"{title} {description or ''} {code}", "code snippets"),
+                ('wp_functions', "SELECT id, function_name, signature, description FROM wp_functions",
+                 lambda function_name, signature, description: f"{function_name} {signature or ''} {description or ''}",
+                 "WordPress functions"),
+                ('wp_hooks', "SELECT id, hook_name, hook_type, description FROM wp_hooks",
+                 lambda hook_name, hook_type, description: f"{hook_name} {hook_type} {description or ''}",
+                 "WordPress hooks"),
+            )
             
-            for hook in hooks:
-                try:
-                    hook_id, hook_name, hook_type, description = hook
-                    embedding_text = f"{hook_name} {hook_type} {description or ''}"
-                    embedding = self._generate_embedding(embedding_text)
-                    
-                    cursor.execute('''
-                    UPDATE wp_hooks
-                    SET embedding = ?
-                    WHERE id = ?
-                    ''', (embedding, hook_id))
-                    
-                    stats["wp_hooks_updated"] += 1
+            for table, sql, build_text, label in sources:
+                rows = await asyncio.to_thread(self._fetch_all, sql)
+                
+                # Encode and write one batch at a time so memory stays flat on large tables
+                for offset in range(0, len(rows), REBUILD_BATCH_SIZE):
+                    batch = rows[offset:offset + REBUILD_BATCH_SIZE]
+                    embeddings = await asyncio.to_thread(
+                        self._generate_embeddings, [build_text(*row[1:]) for row in batch])
+                    updates = [(embedding, row[0]) for row, embedding in zip(batch, embeddings)
+                               if embedding is not None]
                     
-                except Exception as e:
-                    error_msg = f"Error updating embedding for WordPress hook {hook[0]}: {str(e)}"
-                    self.logger.error(error_msg)
-                    stats["errors"].append(error_msg)
-            
-            self.conn.commit()
+                    if len(updates) < len(batch):
+                        error_msg = f"Error generating embeddings for {len(batch) - len(updates)} {label}"
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
+                    if updates:
+                        await asyncio.to_thread(self._execute_write, f"UPDATE {table} SET embedding = ? WHERE id = ?",
+                                                updates, table, many=True)
+                        stats[f"{table}_updated"] += len(updates)
+            
+            # Query embeddings from the previous model no longer match
+            await asyncio.to_thread(self._clear_query_embeddings)
             
             end_time = time.time()
             time_taken = round(end_time - start_time, 2)
@@ -1742,8 +2482,7 @@ class RAGDatabase:
             document_title = row[0]
             
             # Delete document
-            cursor.execute("DELETE FROM documents WHERE id = ?", (document_id,))
-            self.conn.commit()
+            await asyncio.to_thread(self._execute_write, "DELETE FROM documents WHERE id = ?", (document_id,), 'documents')
             
             console.print(f"[bold green]Deleted document: {document_title}[/bold green]")
             
@@ -1789,8 +2528,7 @@ class RAGDatabase:
             snippet_title = row[0]
             
             # Delete snippet
-            cursor.execute("DELETE FROM code_snippets WHERE id = ?", (snippet_id,))
-            self.conn.commit()
+            await asyncio.to_thread(self._execute_write, "DELETE FROM code_snippets WHERE id = ?", (snippet_id,), 'code_snippets')
             
             console.print(f"[bold green]Deleted code snippet: {snippet_title}[/bold green]")
             
@@ -1836,8 +2574,7 @@ class RAGDatabase:
             function_name = row[0]
             
             # Delete function
-            cursor.execute("DELETE FROM wp_functions WHERE id = ?", (function_id,))
-            self.conn.commit()
+            await asyncio.to_thread(self._execute_write, "DELETE FROM wp_functions WHERE id = ?", (function_id,), 'wp_functions')
             
             console.print(f"[bold green]Deleted WordPress function: {function_name}[/bold green]")
             
@@ -1883,8 +2620,7 @@ class RAGDatabase:
             hook_name = row[0]
             
             # Delete hook
-            cursor.execute("DELETE FROM wp_hooks WHERE id = ?", (hook_id,))
-            self.conn.commit()
+            await asyncio.to_thread(self._execute_write, "DELETE FROM wp_hooks WHERE id = ?", (hook_id,), 'wp_hooks')
             
             console.print(f"[bold green]Deleted WordPress hook: {hook_name}[/bold green]")
             
@@ -1912,15 +2648,7 @@ class RAGDatabase:
             Dict with operation status
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Get count before deletion
-            cursor.execute("SELECT COUNT(*) FROM search_history")
-            count = cursor.fetchone()[0]
-            
-            # Delete all search history
-            cursor.execute("DELETE FROM search_history")
-            self.conn.commit()
+            count = await asyncio.to_thread(self._clear_search_history)
             
             console.print(f"[bold green]Cleared search history ({count} entries)[/bold green]")
             
@@ -1961,16 +2689,13 @@ class RAGDatabase:
             # Create backup directory if it doesn't exist
             os.makedirs(os.path.dirname(backup_path), exist_ok=True)
             
-            # Close connection temporarily
-            self.conn.commit()
-            self.conn.close()
-            
-            # Copy database file
-            shutil.copy2(self.database_path, backup_path)
-            
-            # Reopen connection
-            self.conn = sqlite3.connect(self.database_path)
-            self.conn.row_factory = sqlite3.Row
+            # The online backup API copies committed pages, including those still in the WAL
+            with self._db_lock:
+                backup_conn = sqlite3.connect(backup_path)
+                try:
+                    self.conn.backup(backup_conn)
+                finally:
+                    backup_conn.close()
             
             console.print(f"[bold green]Database backed up to: {backup_path}[/bold green]")
             self.logger.info(f"Database backed up to: {backup_path}")
@@ -1982,11 +2707,6 @@ class RAGDatabase:
             }
             
         except Exception as e:
-            # Make sure connection is reopened even if backup fails
-            if not self.conn:
-                self.conn = sqlite3.connect(self.database_path)
-                self.conn.row_factory = sqlite3.Row
-                
             error_msg = f"Error backing up database: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
             console.print(f"[bold red]Error:[/bold red] {error_msg}")
@@ -1996,6 +2716,28 @@ class RAGDatabase:
                 "message": error_msg
             }
     
+    def _replace_database(self, backup_path: str) -> None:
+        """Swap the database file for a backup copy and reopen the writer; the read pool must be closed."""
+        # Fold the WAL into the file first; leftover WAL frames would otherwise be replayed over the restored copy
+        with self._db_lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+            self.conn = None
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.database_path + suffix):
+                    os.remove(self.database_path + suffix)
+            
+            # Copy backup file to database path; sidecars may match the replaced database's versions
+            shutil.copy2(backup_path, self.database_path)
+            self._invalidate_embeddings()
+            self._remove_embedding_caches()
+            
+            # Reopen connections, adding tables missing from older backups
+            self._initialize_database()
+            self.conn.row_factory = sqlite3.Row
+            if EMBEDDINGS_AVAILABLE:
+                self._migrate_embeddings()
+    
     async def restore_database(self, backup_path: str) -> Dict[str, Any]:
         """
         Restore database from a backup file.
@@ -2013,19 +2755,15 @@ class RAGDatabase:
                     "message": f"Backup file not found: {backup_path}"
                 }
             
-            # Close connection
-            self.conn.close()
-            self.conn = None
-            
             # Create a backup of current database before restoring
             current_backup = await self.backup_database()
+            if current_backup["status"] != "success":
+                return current_backup
             
-            # Copy backup file to database path
-            shutil.copy2(backup_path, self.database_path)
-            
-            # Reopen connection
-            self.conn = sqlite3.connect(self.database_path)
-            self.conn.row_factory = sqlite3.Row
+            # Waits for in-flight searches to hand their read connections back
+            await asyncio.to_thread(self._close_read_pool)
+            await asyncio.to_thread(self._replace_database, backup_path)
+            self._open_read_pool()
             
             console.print(f"[bold green]Database restored from: {backup_path}[/bold green]")
             console.print(f"[bold yellow]Previous database backed up to: {current_backup['backup_path']}[/bold yellow]")
@@ -2038,10 +2776,12 @@ class RAGDatabase:
             }
             
         except Exception as e:
-            # Make sure connection is reopened even if restore fails
+            # Make sure connections are reopened even if restore fails
             if not self.conn:
-                self.conn = sqlite3.connect(self.database_path)
+                self.conn = self._connect()
                 self.conn.row_factory = sqlite3.Row
+            if not self._read_connections:
+                self._open_read_pool()
                 
             error_msg = f"Error restoring database: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
@@ -2148,7 +2888,8 @@ class RAGDatabase:
             }
     
     def close(self):
-        """Close the database connection."""
+        """Close the database connections."""
+        self._close_read_pool()
         if self.conn:
             self.conn.close()
             self.conn = None